@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark clean_text on multi-megabyte raw extractions.
+
+Repeats the registered courses' raw text up to each target size and times
+the old clean_text (one re.sub per rule, recompiled per call), a single
+case-insensitive alternation, and the TextCleaner engine. The engine's
+output must match the alternation's exactly.
+
+Usage:
+    python bench_clean_text.py [--sizes 1,4,16] [--repeat 3]
+"""
+import argparse
+import re
+import time
+
+from course_registry import load_registry, source_path
+from parse_courses_v3 import CLEAN_RULES
+from text_cleaner import BLANK_RUNS, TextCleaner
+
+
+def legacy_clean(text, rules):
+    """clean_text as it was: a full pass per rule."""
+    for pattern in rules:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def alternation_clean(text, pattern):
+    return BLANK_RUNS.sub('\n\n', pattern.sub('', text)).strip()
+
+
+def best_of(repeat, fn, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the clean_text engine")
+    parser.add_argument('--sizes', default='1,4,16', help="comma-separated text sizes in MB")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    courses = load_registry()
+    corpus = ''.join(source_path(course).read_text() for course in courses)
+    rules = CLEAN_RULES + tuple(rule for course in courses for rule in course.get('clean', ()))
+    cleaner = TextCleaner(rules)
+    combined = re.compile('|'.join(f'(?:{rule})' for rule in rules), re.IGNORECASE | re.MULTILINE)
+
+    print(f"🧹 {len(rules)} rules, corpus {len(corpus) / 1e6:.2f} MB\n")
+    print(f"{'size':>8}  {'per-rule':>9}  {'alternation':>11}  {'engine':>8}  {'speedup':>7}")
+    for size in (float(s) for s in args.sizes.split(',')):
+        text = corpus * max(1, round(size * 1e6 / len(corpus)))
+        legacy, _ = best_of(args.repeat, legacy_clean, text, rules)
+        alternation, expected = best_of(args.repeat, alternation_clean, text, combined)
+        engine, result = best_of(args.repeat, cleaner.clean, text)
+        assert result == expected, "engine output differs from the combined alternation"
+        print(f"{len(text) / 1e6:>6.1f}MB  {legacy:>8.3f}s  {alternation:>10.3f}s  {engine:>7.3f}s  "
+              f"{legacy / engine:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
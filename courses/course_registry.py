@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Course registry shared by the course build stages.
+
+Each course is one JSON file in registry/ giving its ID, titles, the raw
+source text, any extra clean_text rules for it, how to split that text
+into chapters and its chapter titles (or, for courses split at markers,
+overrides for titles detected from the layout). The stages
+(parse_courses_v3, reformat_content_final, split_into_pages) loop over
+the registry and process independent courses in parallel worker
+processes, so a new exam is a new registry file.
+
+File layout for a course named <name>:
+    courses/<pdf>                     source PDF, if ingested with ingest_pdf.py
+    courses/<name>_lines.jsonl        line records extracted from it
+    courses/<source>                  raw text
+    courses/<name>.json               parsed chapters
+    courses/<name>_formatted.json     reformatted chapters
+    public/courses/<name>.json        published pages
+"""
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+COURSES_DIR = Path(__file__).parent
+REGISTRY_DIR = COURSES_DIR / 'registry'
+PUBLIC_DIR = COURSES_DIR.parent / 'public' / 'courses'
+
+
+def load_registry(names=None) -> list[dict]:
+    """Registered courses sorted by name, optionally only those named (by name or courseId)."""
+    courses = []
+    for path in sorted(REGISTRY_DIR.glob('*.json')):
+        with open(path) as f:
+            courses.append(json.load(f))
+    if names:
+        unknown = set(names) - {c['name'] for c in courses} - {c['courseId'] for c in courses}
+        if unknown:
+            raise SystemExit(f"Unknown courses: {sorted(unknown)}. "
+                             f"Options: {[c['name'] for c in courses]}")
+        courses = [c for c in courses if c['name'] in names or c['courseId'] in names]
+    return courses
+
+
+def source_path(course: dict) -> Path:
+    return COURSES_DIR / course['source']
+
+
+def lines_path(course: dict) -> Path:
+    """Line records extracted from the course's PDF (see ingest_pdf.py)."""
+    return COURSES_DIR / f"{course['name']}_lines.jsonl"
+
+
+def parsed_path(course: dict) -> Path:
+    return COURSES_DIR / f"{course['name']}.json"
+
+
+def formatted_path(course: dict) -> Path:
+    return COURSES_DIR / f"{course['name']}_formatted.json"
+
+
+def public_path(course: dict) -> Path:
+    return PUBLIC_DIR / f"{course['name']}.json"
+
+
+def run_courses(fn, courses: list[dict], workers: int = None) -> list:
+    """Run fn(course) for every course in worker processes; results come back in registry order."""
+    if len(courses) <= 1 or workers == 1:
+        return [fn(course) for course in courses]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, courses))
+
+
+def parse_course_args(description: str) -> tuple[list[dict], int]:
+    """Common CLI for the stages: optional course names and a worker count."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('courses', nargs='*', help="course names or IDs (default: every registered course)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    return load_registry(args.courses), args.workers
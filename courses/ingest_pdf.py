@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Ingest a course straight from its PDF.
+
+Pages are extracted in parallel worker processes with PyMuPDF
+(`pip install pymupdf`), each text line becoming a record:
+
+    {"page", "line", "x", "y", "y1", "size", "bold", "indent", "heading", "text"}
+
+`x`/`y`/`y1` are in points, `size` is the largest font size on the line,
+`indent` the left offset from the page margin in spaces, `line` the
+line's number in the rendered text, and `heading` marks bold or larger
+than body text. The records go to courses/<name>_lines.jsonl (after a
+header line naming the PDF and its hash) and the same lines are rendered
+as layout text, with indentation as spaces and a form feed at each new
+page, to the course's raw "source" file, so every later stage and the
+source ranges work unchanged. parse_courses_v3 reads the heading styles
+back to find chapter titles.
+
+A course opts in with "pdf" in its registry file (a path under courses/).
+
+Usage:
+    python ingest_pdf.py [course ...] [--workers N] [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from course_registry import COURSES_DIR, lines_path, load_registry, source_path
+
+# Bump when the records or rendered text for the same PDF change
+VERSION = '1'
+
+PAGES_PER_TASK = 8
+BOLD_FLAG = 16  # PyMuPDF span flag
+INDENT_PT = 4.5  # points of left offset rendered as one space
+PARAGRAPH_GAP = 0.8  # a vertical gap over this many line heights becomes a blank line
+HEADING_RATIO = 1.15  # font size over body size that makes a heading
+
+
+def pdf_path(course: dict):
+    return COURSES_DIR / course['pdf']
+
+
+def pdf_digest(path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def extract_range(path: str, start: int, stop: int) -> list[list[dict]]:
+    """Line records (page, x, y, y1, size, bold, text) for pages start..stop-1; runs in a worker."""
+    import fitz  # PyMuPDF; only ingestion needs it
+
+    pages = []
+    with fitz.open(path) as doc:
+        for number in range(start, stop):
+            lines = []
+            for block in doc[number].get_text('dict', sort=True)['blocks']:
+                for line in block.get('lines', ()):
+                    spans = [span for span in line['spans'] if span['text'].strip()]
+                    if not spans:
+                        continue
+                    lines.append({
+                        'page': number + 1,
+                        'x': round(spans[0]['bbox'][0], 1),
+                        'y': round(line['bbox'][1], 1),
+                        'y1': round(line['bbox'][3], 1),
+                        'size': round(max(span['size'] for span in spans), 1),
+                        'bold': all(span['flags'] & BOLD_FLAG or 'Bold' in span['font'] for span in spans),
+                        'text': ''.join(span['text'] for span in line['spans']).strip(),
+                    })
+            pages.append(lines)
+    return pages
+
+
+def page_count(path) -> int:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def extract_pages(path, workers: int = None) -> list[list[dict]]:
+    """Every page's line records, extracted PAGES_PER_TASK pages per task across a process pool."""
+    total = page_count(path)
+    starts = range(0, total, PAGES_PER_TASK)
+    stops = [min(start + PAGES_PER_TASK, total) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = pool.map(extract_range, [str(path)] * len(starts), starts, stops)
+        return [page for chunk in chunks for page in chunk]
+
+
+def body_size(pages) -> float:
+    """The font size most of the text is set in."""
+    sizes = Counter()
+    for page in pages:
+        for record in page:
+            sizes[record['size']] += len(record['text'])
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def render(pages):
+    """Yield (record, text line) in reading order, numbering records by rendered line.
+
+    Blank lines stand in for paragraph gaps and are yielded with record None.
+    """
+    margins = [min(record['x'] for record in page) for page in pages if page]
+    margin = statistics.median(margins) if margins else 0.0
+    body = body_size(pages)
+    line_no = 0
+    for page in pages:
+        prev = None
+        for i, record in enumerate(page):
+            if prev and record['y'] - prev['y1'] > PARAGRAPH_GAP * (prev['y1'] - prev['y']):
+                line_no += 1
+                yield None, '\n'
+            line_no += 1
+            indent = max(0, round((record['x'] - margin) / INDENT_PT))
+            record = dict(record, line=line_no, indent=indent,
+                          heading=record['bold'] or record['size'] >= body * HEADING_RATIO)
+            feed = '\f' if i == 0 and record['page'] > 1 else ''
+            yield record, f"{feed}{' ' * indent}{record['text']}\n"
+            prev = record
+
+
+def is_current(course: dict) -> bool:
+    """Whether the course's line records were made from its current PDF by this VERSION."""
+    path = lines_path(course)
+    if not path.exists() or not source_path(course).exists():
+        return False
+    with open(path) as f:
+        header = json.loads(f.readline() or '{}')
+    return header.get('version') == VERSION and header.get('sha256') == pdf_digest(pdf_path(course))
+
+
+def ingest_course(course: dict, workers: int = None) -> dict:
+    """Extract a course's PDF into its line records and raw text; returns the header written."""
+    path = pdf_path(course)
+    pages = extract_pages(path, workers)
+    header = {'pdf': course['pdf'], 'sha256': pdf_digest(path), 'version': VERSION, 'pages': len(pages)}
+
+    lines_tmp = lines_path(course).with_suffix('.tmp')
+    text_tmp = source_path(course).with_suffix('.tmp')
+    lines = 0
+    with open(lines_tmp, 'w') as records, open(text_tmp, 'w') as text:
+        records.write(json.dumps(header) + '\n')
+        for record, line in render(pages):
+            text.write(line)
+            lines += 1
+            if record:
+                records.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(text_tmp, source_path(course))
+    os.replace(lines_tmp, lines_path(course))
+    return dict(header, lines=lines)
+
+
+def load_styles(course: dict) -> dict[int, tuple[float, bool]]:
+    """(size, bold) of each heading line in the course's rendered text, by line number; {} without records."""
+    path = lines_path(course)
+    styles = {}
+    if course.get('pdf') and path.exists():
+        with open(path) as f:
+            next(f)  # header
+            for row in f:
+                record = json.loads(row)
+                if record['heading']:
+                    styles[record['line']] = (record['size'], record['bold'])
+    return styles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract course PDFs into line records and raw text")
+    parser.add_argument('courses', nargs='*', help="course names or IDs (default: every course with a \"pdf\")")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="re-extract even if the PDF is unchanged")
+    args = parser.parse_args()
+
+    courses = [course for course in load_registry(args.courses) if course.get('pdf')]
+    if not courses:
+        print("No registered course has a \"pdf\"; nothing to ingest")
+        return
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        raise SystemExit("PDF ingestion needs PyMuPDF: pip install pymupdf")
+
+    for course in courses:
+        if not args.force and is_current(course):
+            print(f"✓ {course['name']}: {course['pdf']} unchanged")
+            continue
+        header = ingest_course(course, args.workers)
+        print(f"✅ {course['name']}: {header['pages']} pages → {header['lines']} lines "
+              f"({lines_path(course).name}, {source_path(course).name})")
+
+
+if __name__ == '__main__':
+    main()
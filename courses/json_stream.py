@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Course JSON files written and read one list item at a time.
+
+The course files are objects whose last field is a long list
+({..., "chapters": [...]} or {..., "pages": [...]}). JSONStream writes
+such a file item by item: items go to a spool file as they arrive and
+the head fields, which may depend on the item count, are written in
+front of them at the end. The bytes are the same as json.dump() of the
+whole object. iter_items() and load_head() read the file back without
+parsing more than one item at a time.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+BLOCK = 1 << 16
+
+
+class JSONStream:
+    """Write {**head, key: [item, ...]} to path, holding only one item in memory."""
+
+    def __init__(self, path: Path, key: str, indent: int = 2, **dump_kwargs):
+        self.path = Path(path)
+        self.key = key
+        self.indent = indent
+        self.dump_kwargs = dump_kwargs
+        self.count = 0
+        self.spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.spool.close()
+
+    def add(self, item):
+        prefix = ' ' * (2 * self.indent)
+        if self.count:
+            self.spool.write(',\n' + prefix)
+        text = json.dumps(item, indent=self.indent, **self.dump_kwargs)
+        self.spool.write(text.replace('\n', '\n' + prefix))
+        self.count += 1
+
+    def finish(self, head: dict, dry_run=False) -> bool:
+        """Write the file (unless dry_run); returns whether it changed (or would)."""
+        text = json.dumps({**head, self.key: []}, indent=self.indent, **self.dump_kwargs)
+        if self.count:
+            # The list is the last field, so its "[]" closes the text just before the final "}"
+            before, after = text[:text.rindex('[]')], text[text.rindex('[]') + 2:]
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            if self.count:
+                f.write(f"{before}[\n{' ' * (2 * self.indent)}")
+                self.spool.seek(0)
+                shutil.copyfileobj(self.spool, f)
+                f.write(f"\n{' ' * self.indent}]{after}")
+            else:
+                f.write(text)
+        changed = not (self.path.exists() and same_bytes(tmp, self.path))
+        if changed and not dry_run:
+            os.replace(tmp, self.path)
+        else:
+            tmp.unlink()
+        return changed
+
+
+def same_bytes(a: Path, b: Path) -> bool:
+    if a.stat().st_size != b.stat().st_size:
+        return False
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        while True:
+            block = fa.read(BLOCK)
+            if block != fb.read(BLOCK):
+                return False
+            if not block:
+                return True
+
+
+class _Reader:
+    """Decode JSON values from a file, reading more whenever a value runs past the buffer."""
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        # Read at least as much as is buffered, so a long value is re-scanned O(log n) times
+        chunk = self.f.read(max(BLOCK, len(self.buf) - self.pos))
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError(f"unexpected end of {self.f.name}")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in {self.f.name} near {self.buf[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next block
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _open_list(reader: _Reader, key: str) -> dict:
+    """Read the object's fields up to the start of list `key`; returns them."""
+    head = {}
+    reader.expect('{')
+    while reader.peek() != '}':
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            reader.expect('[')
+            return head
+        head[name] = reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+    raise ValueError(f"no {key!r} list in {reader.f.name}")
+
+
+def load_head(path: Path, key: str) -> dict:
+    """The fields of a course file that come before its list `key`."""
+    with open(path, encoding='utf-8') as f:
+        return _open_list(_Reader(f), key)
+
+
+def iter_items(path: Path, key: str):
+    """The items of a course file's list `key`, one at a time."""
+    with open(path, encoding='utf-8') as f:
+        reader = _Reader(f)
+        _open_list(reader, key)
+        while reader.peek() != ']':
+            yield reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
@@ -1,59 +1,132 @@
 #!/usr/bin/env python3
-"""Parse insurance PDFs into structured JSON courses - v3."""
-import json
+"""Parse insurance PDFs into structured JSON courses - v3.
+
+Every course in the registry (see course_registry.py) is parsed from its
+raw text into courses/<name>.json; courses run in parallel.
+
+The raw text is streamed: lines are read one at a time, chapter
+boundaries are found as they go by (iter_pieces), and each piece is
+cleaned, turned into a chapter record and written out (json_stream.py)
+before the next is read, so memory is bounded by the largest chapter
+rather than the whole file.
+
+Usage:
+    python parse_courses_v3.py [course ...] [--workers N]
+"""
+import collections
 import re
 
-def clean_text(text):
-    """Remove XCEL branding and clean up text."""
-    patterns = [
-        r'xcel\s+an?\s+stc\s+company',
-        r'XCEL\s+Solutions',
-        r'XCELsolutions\.com',
-        r'Copyright\s*©\s*\d{4}\s*XCEL\s*Solutions\.?',
-        r'Copyright\s*©\s*XCEL\s*Solutions\.?\s*All\s*rights\s*reserved',
-        r'904\s*-\s*999\s*-\s*4923',
-        r'\|\s*Review Notes - Life and Health Insurance\s*\|',
-        r'Page\s+\d+\s*$',
-        r'^\s*\d{2,3}\s*$',
-    ]
-    for pattern in patterns:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
-    
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    return text.strip()
+from course_registry import parse_course_args, parsed_path, run_courses, source_path
+from ingest_pdf import load_styles
+from json_stream import JSONStream
+from source_map import SourceText, byte_len
+from text_cleaner import get_cleaner
+from title_detector import MAX_TITLE_LINES, TitleTrie, detect_title
 
-def parse_florida_laws(filepath):
-    """Parse Florida Laws PDF into 3 main sections."""
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    content = clean_text(content)
-    
-    sections = re.split(r'(FLORIDA LAWS, RULES, AND REGULATIONS (?:COMMON TO ALL LINES OF\s*INSURANCE|PERTINENT TO LIFE INSURANCE|PERTINENT TO HEALTH))', content, flags=re.IGNORECASE)
-    
-    chapters = []
-    main_sections = [
-        ("COMMON TO ALL LINES", "common_all_lines", "Florida Laws Common to All Lines of Insurance"),
-        ("PERTINENT TO LIFE", "life_insurance", "Florida Laws Pertinent to Life Insurance"),
-        ("PERTINENT TO HEALTH", "health_insurance", "Florida Laws Pertinent to Health Insurance"),
-    ]
+# Part of build_content.py's artifact keys: bump when output for the same input changes
+VERSION = '4'
+
+# Lines searched for a chapter boundary; a boundary may span this many lines
+BOUNDARY_LINES = 4
+
+# Branding and page numbers removed from every course; a registry entry's
+# "clean" list adds rules for that course only
+CLEAN_RULES = (
+    r'xcel\s+an?\s+stc\s+company',
+    r'XCEL\s+Solutions',
+    r'XCELsolutions\.com',
+    r'Copyright\s*©\s*\d{4}\s*XCEL\s*Solutions\.?',
+    r'Copyright\s*©\s*XCEL\s*Solutions\.?\s*All\s*rights\s*reserved',
+    r'904\s*-\s*999\s*-\s*4923',
+    r'Page\s+\d+\s*$',
+    r'^\s*\d{2,3}\s*$',
+)
+
+def clean_text(text, rules=()):
+    """Remove XCEL branding (and any course-specific rules) and clean up text."""
+    return get_cleaner(CLEAN_RULES + tuple(rules)).clean(text)
+
+def advance(pos, text):
+    """(byte, line) just past text when it starts at pos."""
+    return pos[0] + byte_len(text), pos[1] + text.count('\n')
+
+def iter_pieces(lines, course):
+    """Stream re.split(course's split pattern, text): the text between
+    boundaries, each followed by the boundary's groups, all cleaned and
+    as SourceText, so they keep their place in the raw file.
+
+    A boundary is accepted once a full line follows it, so it is the one
+    re.split would find as long as it spans at most BOUNDARY_LINES lines.
+    Lines from a boundary on stay in the window until it is accepted, so
+    a boundary whose trailing whitespace runs over many blank lines is
+    never pushed into the piece before it.
+    """
+    pattern = re.compile(course['split']['pattern'], re.IGNORECASE)
+    cleaner = get_cleaner(CLEAN_RULES + tuple(course.get('clean', ())))
+    piece = []  # lines of the current piece that have left the window
+    start = (0, 1)  # (byte, line) in the file where the current piece starts
+    window = collections.deque()
+
+    def split_window(at_end=False):
+        """Yield the boundaries accepted in the window; returns where the first pending one starts."""
+        nonlocal piece, start, window
+        while True:
+            text = ''.join(window)
+            match = pattern.search(text)
+            if not match:
+                return len(text)
+            if not at_end and match.end() > len(text) - len(window[-1]):
+                return match.start()
+            piece.append(text[:match.start()])
+            body = ''.join(piece)
+            yield cleaner.clean_source(SourceText.raw(body, *start))
+            start = advance(start, body)
+            boundary = SourceText.raw(match.group(), *start)
+            for i, group in enumerate(match.groups(), 1):
+                group = boundary.slice(match.start(i) - match.start(), match.end(i) - match.start()) if group else SourceText.raw('', *start)
+                yield cleaner.clean_source(group)
+            start = advance(start, match.group())
+            piece = []
+            window = collections.deque([text[match.end():]])
+
+    for line in lines:
+        window.append(line)
+        pending = yield from split_window()
+        # Only lines wholly before a pending boundary may leave the window
+        while len(window) > BOUNDARY_LINES and len(window[0]) <= pending:
+            pending -= len(window[0])
+            piece.append(window.popleft())
+    yield from split_window(at_end=True)
+    piece.extend(window)
+    yield cleaner.clean_source(SourceText.raw(''.join(piece), *start))
+
+def chapter_record(title, chapter_id, content):
+    """A chapter with its content and where that content sits in the raw file."""
+    return {
+        "title": title,
+        "id": chapter_id,
+        "content": content.text,
+        "source": content.span(0, len(content.text)) if content.text else None,
+        "source_map": content.runs,
+    }
+
+def split_by_sections(sections, course, styles=None):
+    """Split where the course's header pattern matches; the header names the chapter."""
+    main_sections = [(t['match'], t['id'], t['title']) for t in course['titles']]
     
     current_main = None
     current_content = []
     
     for section in sections:
-        if not section.strip():
+        if not section.text.strip():
             continue
             
         is_header = False
         for pattern, sec_id, title in main_sections:
-            if pattern.lower() in section.lower():
+            if pattern.lower() in section.text.lower():
                 if current_main and current_content:
-                    chapters.append({
-                        "title": current_main[2],
-                        "id": current_main[1],
-                        "content": '\n'.join(current_content).strip()
-                    })
+                    yield chapter_record(current_main[2], current_main[1],
+                                         SourceText.join('\n', current_content).strip())
                 current_main = (pattern, sec_id, title)
                 current_content = []
                 is_header = True
@@ -63,121 +136,94 @@ def parse_florida_laws(filepath):
             current_content.append(section)
     
     if current_main and current_content:
-        chapters.append({
-            "title": current_main[2],
-            "id": current_main[1],
-            "content": '\n'.join(current_content).strip()
-        })
-    
-    return {
-        "courseId": "florida_laws_lh",
-        "title": "Florida Laws - Life & Health Insurance",
-        "description": "Florida-specific laws, rules, and regulations for Life and Health Insurance licensing.",
-        "totalChapters": len(chapters),
-        "chapters": chapters
-    }
+        yield chapter_record(current_main[2], current_main[1], SourceText.join('\n', current_content).strip())
 
-def parse_review_notes(filepath):
-    """Parse Review Notes PDF into chapters with proper multi-line titles."""
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    content = clean_text(content)
-    
-    # Full chapter titles (manually matched from PDF)
-    chapter_titles = {
-        "BASIC PRINCIPLES OF LIFE AND": "Basic Principles of Life and Health Insurance",
-        "THE NATURE OF INSURANCE": "The Nature of Insurance",
-        "LEGAL CONCEPTS OF INSURANCE": "Legal Concepts of Insurance",
-        "LIFE INSURANCE POLICY TYPES": "Life Insurance Policy Types",
-        "LIFE INSURANCE POLICY\nPROVISIONS": "Life Insurance Policy Provisions, Options, and Riders",
-        "LIFE INSURANCE PREMIUMS": "Life Insurance Premiums, Proceeds, and Beneficiaries",
-        "LIFE INSURANCE UNDERWRITING": "Life Insurance Underwriting and Policy Issue",
-        "GROUP LIFE INSURANCE": "Group Life Insurance",
-        "ANNUITIES": "Annuities",
-        "SOCIAL SECURITY": "Social Security",
-        "RETIREMENT PLANS": "Retirement Plans",
-        "USES OF LIFE INSURANCE": "Uses of Life Insurance",
-        "INTRODUCTION TO HEALTH AND": "Introduction to Health and Accident Insurance",
-        "HEALTH INSURANCE PROVIDERS": "Health Insurance Providers",
-        "MEDICAL EXPENSE INSURANCE": "Medical Expense Insurance",
-        "DISABILITY INCOME INSURANCE": "Disability Income Insurance",
-        "INSURANCE PLANS FOR SENIORS": "Insurance Plans for Seniors and Special Needs",
-        "HEALTH INSURANCE POLICY": "Health Insurance Policy Provisions",
-        "HEALTH INSURANCE\n": "Health Insurance",
-    }
-    
-    parts = re.split(r'REVIEW NOTES:\s*', content, flags=re.IGNORECASE)
-    
-    chapters = []
+def split_by_markers(parts, course, styles=None):
+    """Split after each chapter marker; the first line(s) after it name the chapter.
+
+    styles maps raw line numbers to heading styles for courses ingested
+    from a PDF (ingest_pdf.load_styles).
+    """
+    # Optional overrides for titles the layout gets wrong (see title_detector.py)
+    trie = TitleTrie(course.get('titles', ()))
     
     for i, part in enumerate(parts):
-        if not part.strip() or i == 0:
+        part = part.strip()
+        if not part.text or i == 0:
             continue
             
-        lines = part.strip().split('\n')
-        if not lines:
-            continue
-        
-        # Find title by matching known patterns
-        raw_title = lines[0].strip()
-        full_title = None
-        content_start = 1
-        
-        # Check if title continues to next line
-        for pattern, clean_title in chapter_titles.items():
-            if raw_title.upper().startswith(pattern.split('\n')[0].upper()):
-                full_title = clean_title
-                # If pattern has newline, title spans 2 lines
-                if '\n' in pattern:
-                    content_start = 2
-                break
-        
-        if not full_title:
-            full_title = raw_title.title()
+        lines = part.text.split('\n')
+        head = None
+        if styles:
+            starts = [0]
+            for line in lines[:MAX_TITLE_LINES - 1]:
+                starts.append(starts[-1] + len(line) + 1)
+            head = [styles.get(part.locate(start)[1]) for start in starts[:len(lines)]]
+        full_title, content_start = detect_title(lines, trie, head)
         
         chapter_id = re.sub(r'[^a-z0-9]+', '_', full_title.lower()).strip('_')[:50]
-        content_text = '\n'.join(lines[content_start:]).strip()
+        content = part.slice(sum(len(line) + 1 for line in lines[:content_start])).strip()
         
-        if content_text and len(content_text) > 50:
-            chapters.append({
-                "title": full_title,
-                "id": chapter_id,
-                "content": content_text
-            })
-    
+        if content.text and len(content.text) > 50:
+            yield chapter_record(full_title, chapter_id, content)
+
+SPLITTERS = {
+    'sections': split_by_sections,
+    'markers': split_by_markers,
+}
+
+def iter_chapters(lines, course, styles=None):
+    """Chapter records, one at a time, from an iterable of raw text lines."""
+    return SPLITTERS[course['split']['type']](iter_pieces(lines, course), course, styles)
+
+def iter_course(course):
+    """A registered course's chapter records, one at a time, streaming its raw text."""
+    styles = load_styles(course)
+    with open(source_path(course), 'r') as f:
+        yield from iter_chapters(f, course, styles)
+
+def course_head(course, total_chapters):
+    """The fields of courses/<name>.json before its chapters."""
     return {
-        "courseId": "review_notes_lh",
-        "title": "Review Notes - Life & Health Insurance",
-        "description": "Comprehensive review notes covering all topics for Life and Health Insurance licensing exam.",
-        "totalChapters": len(chapters),
-        "chapters": chapters
+        "courseId": course['courseId'],
+        "title": course['title'],
+        "description": course['description'],
+        "totalChapters": total_chapters,
     }
 
+def parse_course(course):
+    """Parse a registered course's raw text into chapters, all in memory."""
+    return parsed_course(iter_course(course), course)
+
+def parsed_course(chapters, course):
+    chapters = list(chapters)
+    return dict(course_head(course, len(chapters)), chapters=chapters)
+
+def build_course(course):
+    """
+    Parse one course into courses/<name>.json, a chapter at a time; runs in
+    a worker process. Returns (title, word count) per chapter.
+    """
+    summary = []
+    with JSONStream(parsed_path(course), 'chapters') as out:
+        for chapter in iter_course(course):
+            out.add(chapter)
+            summary.append((chapter['title'], len(chapter['content'].split())))
+        out.finish(course_head(course, out.count))
+    return summary
+
 if __name__ == "__main__":
-    base_path = "/Users/dave/clawd/projects/getmealicense/courses"
-    
-    # Parse Florida Laws
-    fl_laws = parse_florida_laws(f"{base_path}/florida_laws_raw.txt")
-    with open(f"{base_path}/florida_laws.json", 'w') as f:
-        json.dump(fl_laws, f, indent=2)
-    print(f"✅ Florida Laws: {fl_laws['totalChapters']} chapters")
-    for ch in fl_laws['chapters']:
-        word_count = len(ch['content'].split())
-        print(f"   • {ch['title']} ({word_count} words)")
-    
-    print()
-    
-    # Parse Review Notes
-    review = parse_review_notes(f"{base_path}/review_notes_raw.txt")
-    with open(f"{base_path}/review_notes.json", 'w') as f:
-        json.dump(review, f, indent=2)
-    print(f"✅ Review Notes: {review['totalChapters']} chapters")
-    for ch in review['chapters']:
-        word_count = len(ch['content'].split())
-        print(f"   • {ch['title']} ({word_count} words)")
+    courses, workers = parse_course_args("Parse raw course text into chapters")
+    
+    total_chapters = 0
+    total_words = 0
+    for course, summary in zip(courses, run_courses(build_course, courses, workers)):
+        print(f"✅ {course['title']}: {len(summary)} chapters")
+        for title, word_count in summary:
+            print(f"   • {title} ({word_count} words)")
+            total_words += word_count
+        total_chapters += len(summary)
+        print()
     
     # Summary
-    total_words = sum(len(ch['content'].split()) for ch in fl_laws['chapters'])
-    total_words += sum(len(ch['content'].split()) for ch in review['chapters'])
-    print(f"\n📊 Total: {fl_laws['totalChapters'] + review['totalChapters']} chapters, ~{total_words} words")
+    print(f"📊 Total: {total_chapters} chapters, ~{total_words} words")
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 """Reformat course content for plain text readability."""
-import json
-import re
+from array import array
+
+from course_registry import formatted_path, parse_course_args, parsed_path, run_courses
+from json_stream import JSONStream, iter_items, load_head
+from source_map import SourceText
+
+# Part of build_content.py's artifact keys: bump when output for the same input changes
+VERSION = '2'
 
 def reformat_content(text):
     """
@@ -10,198 +16,147 @@ def reformat_content(text):
     - Clear bullet point formatting
     - Good paragraph spacing
     """
-    lines = text.split('\n')
-    result_lines = []
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-        
-        # Skip empty lines, form feeds, page numbers
-        if not stripped or stripped == '\f' or stripped.isdigit():
-            i += 1
-            continue
-        
-        leading_spaces = len(line) - len(line.lstrip())
-        
-        # "o " bullet points (main level)
-        if stripped.startswith('o ') and leading_spaces <= 2:
-            bullet_text = stripped[2:].strip()
-            i += 1
-            
-            # Collect continuation lines
-            while i < len(lines):
-                next_line = lines[i]
-                next_stripped = next_line.strip()
-                next_spaces = len(next_line) - len(next_line.lstrip())
-                
-                if not next_stripped or next_stripped == '\f' or next_stripped.isdigit():
-                    i += 1
-                    continue
-                    
-                # Stop if we hit a new bullet, header, or sub-bullet
-                if next_stripped.startswith('o ') and next_spaces <= 2:
-                    break
-                if next_spaces == 0 and not next_stripped.startswith('o '):
-                    break
-                if next_spaces >= 8 or '\uf0a7' in next_stripped or '\uf09f' in next_stripped:
-                    break
-                    
-                # Continuation
-                if next_spaces >= 2 and next_spaces < 8:
-                    bullet_text += ' ' + next_stripped
-                    i += 1
-                else:
-                    break
-            
-            bullet_text = re.sub(r'\s+', ' ', bullet_text).strip()
-            if bullet_text:
-                result_lines.append(f'• {bullet_text}')
+    return reformat_with_lines(text)[0]
+
+# Line flags, computed once per line by classify_lines()
+SKIP = 1  # blank, form feed or a bare page number
+O_BULLET = 2  # starts with "o "
+GLYPH = 4  # holds a \uf0a7 / \uf09f bullet glyph
+
+# What a line opens when no bullet or paragraph is collecting it
+BULLET, SUB_BULLET, TOP, CONTINUATION, PLAIN = range(5)
+
+def classify_lines(lines):
+    """(stripped text, indents, flags) for every line; indents and flags are compact arrays."""
+    stripped = [line.strip() for line in lines]
+    indents = array('i', [len(line) - len(line.lstrip()) for line in lines])
+    flags = bytearray(len(lines))
+    for i, text in enumerate(stripped):
+        if not text or text.isdigit():
+            flags[i] = SKIP
             continue
-        
-        # Sub-bullets (heavily indented or special chars)
-        if leading_spaces >= 8 or '\uf0a7' in stripped or '\uf09f' in stripped:
-            sub_text = stripped.replace('\uf0a7', '').replace('\uf09f', '').strip()
-            i += 1
-            
-            # Collect continuation
-            while i < len(lines):
-                next_line = lines[i]
-                next_stripped = next_line.strip()
-                next_spaces = len(next_line) - len(next_line.lstrip())
-                
-                if not next_stripped or next_stripped == '\f' or next_stripped.isdigit():
-                    i += 1
-                    continue
-                    
-                if next_stripped.startswith('o ') or next_spaces == 0:
-                    break
-                if '\uf0a7' in next_stripped or '\uf09f' in next_stripped:
-                    break
-                    
-                if next_spaces >= 8:
-                    sub_text += ' ' + next_stripped.replace('\uf0a7', '').replace('\uf09f', '')
-                    i += 1
-                else:
-                    break
-            
-            sub_text = re.sub(r'\s+', ' ', sub_text).strip()
-            if sub_text:
-                result_lines.append(f'   ◦ {sub_text}')
+        if text.startswith('o '):
+            flags[i] |= O_BULLET
+        if '\uf0a7' in text or '\uf09f' in text:
+            flags[i] |= GLYPH
+    return stripped, indents, flags
+
+def opens(indent, flag):
+    """The kind of block a line starts (the order of these checks matters)."""
+    if flag & O_BULLET and indent <= 2:
+        return BULLET
+    if indent >= 8 or flag & GLYPH:
+        return SUB_BULLET
+    if indent == 0:
+        return TOP
+    if 2 <= indent < 8:
+        return CONTINUATION
+    return PLAIN
+
+def continues(kind, indent, flag):
+    """Whether a line is folded into the open bullet, sub-bullet or paragraph."""
+    if kind == BULLET:
+        return 2 <= indent < 8 and not flag & GLYPH and not (flag & O_BULLET and indent == 2)
+    if kind == SUB_BULLET:
+        return indent >= 8 and not flag & (O_BULLET | GLYPH)
+    return 2 <= indent < 8 and not flag & O_BULLET  # paragraph
+
+def reformat_with_lines(text):
+    """
+    reformat_content(), plus the (first, last) input lines (0-based) each
+    output paragraph was built from, in paragraph order.
+
+    Every line is classified once (classify_lines), then one pass folds
+    continuation lines into the open bullet, sub-bullet or paragraph,
+    collecting their words in a list that is joined when the block ends.
+    """
+    lines = text.split('\n')
+    stripped, indents, flags = classify_lines(lines)
+    paragraphs = []
+    spans = []
+    open_kind = None  # BULLET, SUB_BULLET or TOP (a paragraph) while collecting
+    words = []
+    first = end = 0
+    header_end = -1  # len(paragraphs) right after the last header, which is never extended
+
+    def close():
+        folded = ' '.join(' '.join(words).split())
+        if folded:
+            prefix = '• ' if open_kind == BULLET else '   ◦ ' if open_kind == SUB_BULLET else ''
+            paragraphs.append(prefix + folded)
+            spans.append((first, end))
+
+    for i, flag in enumerate(flags):
+        if flag & SKIP:
             continue
-        
-        # Topic header (no leading space, not "o ", SHORT title - not a long paragraph)
-        if leading_spaces == 0 and not stripped.startswith('o '):
-            # Check if next line is indented (meaning this is a multi-line paragraph, not a header)
-            is_header = True
-            if i + 1 < len(lines):
-                next_line = lines[i + 1]
-                next_stripped = next_line.strip()
-                next_spaces = len(next_line) - len(next_line.lstrip())
-                # If next line is indented continuation, this is a paragraph not a header
-                if next_spaces >= 2 and next_stripped and not next_stripped.startswith('o '):
-                    is_header = False
-            
-            # Also if it's very long, probably not a header
-            if len(stripped) > 60:
-                is_header = False
-            
-            if is_header:
-                # Add blank line before new topic
-                if result_lines and result_lines[-1] != '':
-                    result_lines.append('')
-                result_lines.append(stripped.upper())
-                result_lines.append('')
-                i += 1
-                continue
-            else:
-                # It's a paragraph - collect all continuation lines
-                para_text = stripped
-                i += 1
-                while i < len(lines):
-                    next_line = lines[i]
-                    next_stripped = next_line.strip()
-                    next_spaces = len(next_line) - len(next_line.lstrip())
-                    
-                    if not next_stripped or next_stripped == '\f' or next_stripped.isdigit():
-                        i += 1
-                        continue
-                    if next_stripped.startswith('o ') or next_spaces == 0:
-                        break
-                    if next_spaces >= 2 and next_spaces < 8:
-                        para_text += ' ' + next_stripped
-                        i += 1
-                    else:
-                        break
-                
-                para_text = re.sub(r'\s+', ' ', para_text).strip()
-                if para_text:
-                    result_lines.append(para_text)
+        indent = indents[i]
+        if open_kind is not None:
+            if continues(open_kind, indent, flag):
+                words.append(stripped[i].replace('\uf0a7', '').replace('\uf09f', '')
+                             if open_kind == SUB_BULLET else stripped[i])
+                end = i
                 continue
-        
-        # Regular continuation text
-        if leading_spaces >= 2 and leading_spaces < 8:
-            # Add to previous line or as new paragraph
-            if result_lines:
-                last = result_lines[-1]
-                if last and not last.startswith('•') and not last.startswith('   ◦') and last != '':
-                    result_lines[-1] = last + ' ' + stripped
-                else:
-                    result_lines.append(stripped)
+            close()
+            open_kind = None
+
+        line = stripped[i]
+        kind = opens(indent, flag)
+        if kind == BULLET:
+            open_kind, words, first, end = BULLET, [line[2:]], i, i
+        elif kind == SUB_BULLET:
+            open_kind, words, first, end = SUB_BULLET, [line.replace('\uf0a7', '').replace('\uf09f', '')], i, i
+        elif kind == TOP:
+            # A short line is a topic header unless the next line continues it as a paragraph
+            nxt = i + 1
+            is_paragraph = len(line) > 60 or (
+                nxt < len(lines) and indents[nxt] >= 2 and stripped[nxt] and not flags[nxt] & O_BULLET)
+            if is_paragraph:
+                open_kind, words, first, end = TOP, [line], i, i
             else:
-                result_lines.append(stripped)
-            i += 1
-            continue
-        
-        result_lines.append(stripped)
-        i += 1
-    
-    # Join with double newlines for paragraph separation
-    final_lines = []
-    prev_was_bullet = False
-    
-    for line in result_lines:
-        if not line:
-            if final_lines and final_lines[-1] != '':
-                final_lines.append('')
-            prev_was_bullet = False
-            continue
-            
-        is_bullet = line.startswith('•') or line.startswith('   ◦')
-        is_header = line.isupper() and len(line) > 3
-        
-        # Add spacing before headers
-        if is_header and final_lines and final_lines[-1] != '':
-            final_lines.append('')
-        
-        final_lines.append(line)
-        prev_was_bullet = is_bullet
-    
-    result = '\n\n'.join([l for l in final_lines if l])
-    result = re.sub(r'\n{4,}', '\n\n\n', result)
-    return result.strip()
+                paragraphs.append(line.upper())
+                spans.append((i, i))
+                header_end = len(paragraphs)
+        elif kind == CONTINUATION and paragraphs and len(paragraphs) != header_end \
+                and not paragraphs[-1].startswith(('•', '   ◦')):
+            paragraphs[-1] = f"{paragraphs[-1]} {line}"
+            spans[-1] = (spans[-1][0], i)
+        else:
+            paragraphs.append(line)
+            spans.append((i, i))
+    if open_kind is not None:
+        close()
+
+    return '\n\n'.join(paragraphs).strip(), spans
+
+def reformat_chapter(chapter, reformatted=None):
+    """
+    A parsed chapter, reformatted; its "paragraphs" give each output
+    paragraph's range in the raw source (see source_map.py).
+    reformatted is reformat_with_lines() of its content, if already done.
+    """
+    content, spans = reformatted or reformat_with_lines(chapter['content'])
+    source = SourceText(chapter['content'], chapter['source_map'])
+    formatted = {key: value for key, value in chapter.items() if key != 'source_map'}
+    formatted['content'] = content
+    formatted['paragraphs'] = source.line_spans(spans)
+    return formatted
+
+def format_course(course):
+    """
+    Reformat one parsed course into courses/<name>_formatted.json, a chapter
+    at a time; runs in a worker process.
+    """
+    with JSONStream(formatted_path(course), 'chapters', ensure_ascii=False) as out:
+        for chapter in iter_items(parsed_path(course), 'chapters'):
+            out.add(reformat_chapter(chapter))
+        out.finish(load_head(parsed_path(course), 'chapters'))
+    return out.count
 
 def main():
-    with open('florida_laws.json', 'r') as f:
-        data = json.load(f)
-    
-    for chapter in data['chapters']:
-        chapter['content'] = reformat_content(chapter['content'])
-    
-    # Save formatted version
-    with open('florida_laws_formatted.json', 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    # Also copy to public folder for the app
-    import shutil
-    shutil.copy('florida_laws_formatted.json', '../public/courses/florida_laws.json')
-    
-    print("✅ Reformatted and deployed to public/courses/florida_laws.json")
-    print("\n" + "="*60)
-    print("SAMPLE:")
-    print("="*60 + "\n")
-    print(data['chapters'][0]['content'][:2000])
+    courses, workers = parse_course_args("Reformat parsed course chapters for plain text reading")
+    for course, count in zip(courses, run_courses(format_course, courses, workers)):
+        print(f"✅ {course['title']}: {count} chapters → {formatted_path(course).name}")
+    print("\nRun split_into_pages.py to publish the pages to public/courses/")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Text that remembers where in the raw source file it came from.
+
+Parsing only ever deletes from the raw text (clean_text removals, blank
+line collapsing, stripping, dropping title lines), so a parsed chapter
+is a series of runs copied verbatim from the file. A SourceText keeps
+the start of each run as (offset in text, byte offset in file, line
+number in file); any offset inside a run is located by counting bytes
+and newlines from the run's start.
+
+Ranges handed to later stages and the published pages are
+{"lines": [first, last], "bytes": [start, end]}: 1-based inclusive
+lines and a 0-based, end-exclusive UTF-8 byte range.
+"""
+import bisect
+
+
+def byte_len(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+class SourceText:
+    """A string plus the raw-file position of each verbatim run in it."""
+
+    __slots__ = ('text', 'runs', '_offsets')
+
+    def __init__(self, text: str, runs):
+        self.text = text
+        self.runs = [tuple(run) for run in runs]  # (offset, byte, line), offsets ascending
+        self._offsets = [run[0] for run in self.runs]
+
+    @classmethod
+    def raw(cls, text: str, byte: int = 0, line: int = 1) -> 'SourceText':
+        """Text read straight from the file, starting at the given position."""
+        return cls(text, [(0, byte, line)])
+
+    def locate(self, offset: int) -> tuple[int, int]:
+        """(byte, line) in the file of the character at offset."""
+        i = bisect.bisect_right(self._offsets, offset) - 1
+        start, byte, line = self.runs[max(i, 0)]
+        run = self.text[start:offset]
+        return byte + byte_len(run), line + run.count('\n')
+
+    def span(self, start: int, end: int) -> dict:
+        """Source range of text[start:end] (end > start)."""
+        first_byte, first_line = self.locate(start)
+        last_byte, last_line = self.locate(end - 1)
+        return {'lines': [first_line, last_line], 'bytes': [first_byte, last_byte + byte_len(self.text[end - 1])]}
+
+    def cut(self, spans) -> 'SourceText':
+        """Copy with the (start, end) spans (sorted, non-overlapping) removed."""
+        kept = []
+        prev = 0
+        for start, end in spans:
+            if start > prev:
+                kept.append((prev, start))
+            prev = max(prev, end)
+        if prev < len(self.text):
+            kept.append((prev, len(self.text)))
+
+        parts = []
+        runs = []
+        size = 0
+        bounds = self._offsets + [len(self.text)]
+        for start, end in kept:
+            # A kept piece may cross run boundaries; each crossing starts a new run
+            i = max(bisect.bisect_right(self._offsets, start) - 1, 0)
+            pos = start
+            while pos < end:
+                stop = min(end, bounds[i + 1])
+                runs.append((size + pos - start, *self.locate(pos)))
+                pos = stop
+                i += 1
+            parts.append(self.text[start:end])
+            size += end - start
+        return SourceText(''.join(parts), runs or [(0, *self.locate(0))])
+
+    def slice(self, start: int, end: int = None) -> 'SourceText':
+        end = len(self.text) if end is None else end
+        return self.cut([(0, start), (end, len(self.text))])
+
+    def strip(self) -> 'SourceText':
+        body = self.text.lstrip()
+        start = len(self.text) - len(body)
+        return self.slice(start, start + len(body.rstrip()))
+
+    @staticmethod
+    def join(sep: str, parts: list['SourceText']) -> 'SourceText':
+        """Like sep.join(); a separator is placed just after the part before it."""
+        texts = []
+        runs = []
+        size = 0
+        for i, part in enumerate(parts):
+            if i:
+                texts.append(sep)
+                prev = parts[i - 1]
+                end = prev.span(0, len(prev.text)) if prev.text else None
+                if end:
+                    runs.append((size, end['bytes'][1], end['lines'][1]))
+                size += len(sep)
+            texts.append(part.text)
+            runs += [(size + offset, byte, line) for offset, byte, line in part.runs]
+            size += len(part.text)
+        return SourceText(''.join(texts), runs or [(0, 0, 1)])
+
+    def line_spans(self, ranges) -> list[dict]:
+        """Source ranges of (first, last) line ranges of the text (0-based, inclusive)."""
+        starts = [0]
+        starts += [i + 1 for i, ch in enumerate(self.text) if ch == '\n']
+        starts.append(len(self.text) + 1)
+        return [self.span(starts[first], starts[last + 1] - 1) for first, last in ranges]
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """Split long chapters into shorter page-sized sections."""
-import json
 import re
-import os
+
+from course_registry import formatted_path, parse_course_args, public_path, run_courses
+from json_stream import JSONStream, iter_items, load_head
+
+# Part of build_content.py's artifact keys: bump when output for the same input changes
+VERSION = '1'
 
 TARGET_WORDS_PER_PAGE = 500  # Roughly 1 book page
 MIN_WORDS_PER_PAGE = 300
@@ -81,52 +85,63 @@ def split_into_pages(content: str, chapter_title: str) -> list[dict]:
     
     return result
 
-def process_course(input_file: str, output_file: str):
-    """Process a course file and split chapters into pages."""
-    with open(input_file, 'r') as f:
-        course = json.load(f)
-    
-    all_pages = []
-    for chapter in course['chapters']:
-        pages = split_into_pages(chapter['content'], chapter['title'])
-        all_pages.extend(pages)
-        print(f"  {chapter['title']}: split into {len(pages)} pages")
-    
-    # Update course structure
-    course['chapters'] = all_pages
-    course['totalChapters'] = len(all_pages)
-    course['description'] += f" ({len(all_pages)} pages)"
-    
-    with open(output_file, 'w') as f:
-        json.dump(course, f, indent=2, ensure_ascii=False)
+def locate_pages(pages: list[dict], paragraphs: list[dict]) -> list[dict]:
+    """Set each page's "source" to the raw range of the chapter paragraphs it holds."""
+    i = 0
+    for page in pages:
+        held = paragraphs[i:i + len(page['content'].split('\n\n'))]
+        i += len(held)
+        page['source'] = {
+            'lines': [min(p['lines'][0] for p in held), max(p['lines'][1] for p in held)],
+            'bytes': [min(p['bytes'][0] for p in held), max(p['bytes'][1] for p in held)],
+        }
+    return pages
+
+def published_head(data: dict, total_pages: int) -> dict:
+    """The fields of the published course JSON before its pages."""
+    return {
+        'courseId': data['courseId'],
+        'title': data['title'],
+        'description': data['description'] + f" ({total_pages} pages)",
+    }
+
+def published_course(data: dict, pages: list[dict]) -> dict:
+    """The course JSON the reader loads: {courseId, title, description, pages}."""
+    return dict(published_head(data, len(pages)), pages=pages)
+
+def process_course(course) -> list[tuple[str, int]]:
+    """
+    Split a formatted course into pages and publish it, a chapter at a
+    time; runs in a worker process.
+    """
+    chapter_counts = []
+    with JSONStream(public_path(course), 'pages', ensure_ascii=False) as out:
+        for chapter in iter_items(formatted_path(course), 'chapters'):
+            pages = locate_pages(split_into_pages(chapter['content'], chapter['title']), chapter['paragraphs'])
+            for page in pages:
+                out.add(page)
+            chapter_counts.append((chapter['title'], len(pages)))
+        out.finish(published_head(load_head(formatted_path(course), 'chapters'), out.count))
     
-    return len(all_pages)
+    return chapter_counts
 
 def main():
+    courses, workers = parse_course_args("Split formatted courses into book-sized pages")
     print("📖 Splitting courses into book-sized pages...")
     print(f"   Target: ~{TARGET_WORDS_PER_PAGE} words per page\n")
     
-    courses_dir = '.'
-    public_dir = '../public/courses'
-    
-    # Process Florida Laws
-    print("Florida Laws:")
-    fl_pages = process_course(
-        f'{courses_dir}/florida_laws_formatted.json',
-        f'{public_dir}/florida_laws.json'
-    )
-    
-    # Process Review Notes  
-    print("\nReview Notes:")
-    rn_pages = process_course(
-        f'{courses_dir}/review_notes_formatted.json',
-        f'{public_dir}/review_notes.json'
-    )
+    totals = []
+    for course, chapter_counts in zip(courses, run_courses(process_course, courses, workers)):
+        print(f"{course['title']}:")
+        for title, n in chapter_counts:
+            print(f"  {title}: split into {n} pages")
+        print()
+        totals.append((course['title'], sum(n for _, n in chapter_counts)))
     
-    print(f"\n✅ Done!")
-    print(f"   Florida Laws: {fl_pages} pages")
-    print(f"   Review Notes: {rn_pages} pages")
-    print(f"   Total: {fl_pages + rn_pages} pages")
+    print(f"✅ Done!")
+    for title, n in totals:
+        print(f"   {title}: {n} pages")
+    print(f"   Total: {sum(n for _, n in totals)} pages")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,32 @@
+"""Tests for parse_courses_v3's streaming split; run with `python -m pytest courses`."""
+import re
+
+from parse_courses_v3 import BOUNDARY_LINES, iter_chapters
+
+COURSE = {
+    'courseId': 'test',
+    'title': 'Test',
+    'description': 'Test course',
+    'split': {'type': 'markers', 'pattern': r'REVIEW NOTES:\s*'},
+}
+
+
+def body(n):
+    return ''.join(f"Sentence {n} number {i} with enough words to keep.\n" for i in range(5))
+
+
+def chapters(text):
+    return list(iter_chapters(text.splitlines(keepends=True), COURSE))
+
+
+def test_marker_followed_by_many_blank_lines_starts_a_chapter():
+    blank = '\n' * (BOUNDARY_LINES + 2)
+    text = f"Intro\nREVIEW NOTES:\n{blank}FIRST\n{body(1)}REVIEW NOTES:\n{blank}SECOND\n{body(2)}"
+    assert [c['title'] for c in chapters(text)] == ['First', 'Second']
+
+
+def test_matches_re_split_with_marker_at_end_of_file():
+    text = f"Intro\nREVIEW NOTES:\nFIRST\n{body(1)}REVIEW NOTES:\nSECOND\n{body(2)}REVIEW NOTES:\n\n\n"
+    parsed = chapters(text)
+    assert [c['title'] for c in parsed] == ['First', 'Second']
+    assert parsed[1]['content'] == re.split(COURSE['split']['pattern'], text)[2].split('\n', 1)[1].strip()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Single-pass removal of branding and page furniture from raw course text.
+
+A TextCleaner compiles its rules once and removes every match in one left
+to right scan, with the same result as one case-insensitive alternation
+of all rules (leftmost match wins, earlier rules win ties). Rather than
+run that alternation, which Python's re tries at every character, each
+rule is searched on its own in a lowercased copy of the text, without
+IGNORECASE, so its literal prefix takes re's fast path. The matches are
+merged in order and the kept text is copied out once.
+"""
+import functools
+import re
+
+BLANK_RUNS = re.compile(r'\n{3,}')
+
+
+def fold_pattern(pattern: str) -> str:
+    """Lowercase the literal characters of a pattern, leaving escapes (\\S, \\D, ...) alone."""
+    out = []
+    escaped = False
+    for ch in pattern:
+        out.append(ch if escaped else ch.lower())
+        escaped = not escaped and ch == '\\'
+    return ''.join(out)
+
+
+class TextCleaner:
+    """Remove every match of a set of case-insensitive, multiline rules."""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.folded = [re.compile(fold_pattern(rule), re.MULTILINE) for rule in self.rules]
+        # For text whose lowercase form has a different length (offsets would not line up)
+        self.combined = re.compile('|'.join(f'(?:{rule})' for rule in self.rules), re.IGNORECASE | re.MULTILINE)
+
+    def spans(self, text: str):
+        """Yield (start, end) of each match, as the combined alternation would find them."""
+        folded = text.lower()
+        if len(folded) != len(text):
+            yield from (m.span() for m in self.combined.finditer(text) if m.end() > m.start())
+            return
+        heads = [rule.search(folded) for rule in self.folded]
+        pos = 0
+        while True:
+            best = None
+            for i, match in enumerate(heads):
+                if match is not None and match.start() < pos:
+                    # Overlapped by an earlier match: look again from where that one ended
+                    match = heads[i] = self.folded[i].search(folded, pos)
+                if match is not None and (best is None or match.start() < best.start()):
+                    best = match
+            if best is None:
+                return
+            if best.end() == best.start():
+                pos = best.end() + 1  # an empty match removes nothing
+                continue
+            yield best.span()
+            pos = best.end()
+
+    def remove(self, text: str) -> str:
+        parts = []
+        prev = 0
+        for start, end in self.spans(text):
+            parts.append(text[prev:start])
+            prev = end
+        parts.append(text[prev:])
+        return ''.join(parts)
+
+    def clean(self, text: str) -> str:
+        """Remove all rule matches, collapse runs of blank lines and trim."""
+        return BLANK_RUNS.sub('\n\n', self.remove(text)).strip()
+
+    def clean_source(self, source):
+        """clean() for a SourceText: the same text, still mapped to the raw file."""
+        source = source.cut(list(self.spans(source.text)))
+        source = source.cut([(m.start() + 2, m.end()) for m in BLANK_RUNS.finditer(source.text)])
+        return source.strip()
+
+
+@functools.lru_cache(maxsize=None)
+def get_cleaner(rules: tuple) -> TextCleaner:
+    """Compiled cleaner for a rule set, built once per process."""
+    return TextCleaner(rules)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Chapter titles worked out from the layout after a chapter marker.
+
+The title starts with the text on the marker line and runs on over the
+following lines while they look like a wrapped heading: flush-left,
+all uppercase, and joined by a connector ("...LIFE AND" / "HEALTH
+INSURANCE", "...UNDERWRITING" / "AND POLICY ISSUE") or a lone wrapped
+word. Indented or mixed-case lines, blank lines and uppercase
+subheadings end it.
+
+For a course ingested from its PDF (ingest_pdf.py) the font is known
+instead: the title is the marker line plus the following lines set in
+the same heading style (size and weight).
+
+Where the layout is ambiguous a course lists overrides in its registry
+"titles" ({"match": "LIFE INSURANCE POLICY PROVISIONS", "title": ...}).
+They go in a word trie and are matched against the words after the
+marker, across line breaks, longest match first, so a lookup costs the
+length of the title rather than the number of overrides.
+"""
+import re
+
+# Words that join the halves of a heading wrapped across lines
+TRAILING_JOINERS = {'AND', 'OR', 'OF', 'TO', 'FOR', 'THE', 'IN', 'ON', 'A', 'AN', 'WITH', '&'}
+LEADING_JOINERS = {'AND', 'OR', 'OF', 'TO', 'FOR', 'IN', 'ON', 'WITH', '&'}
+# Kept lowercase inside a title
+SMALL_WORDS = {'a', 'an', 'and', 'as', 'at', 'by', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'}
+
+MAX_TITLE_LINES = 3
+
+_END = object()  # marks a complete match in a trie node
+
+
+def words(text: str) -> list[str]:
+    """Uppercase words without punctuation, as override matches compare them."""
+    return re.findall(r"[\w&'’]+", text.upper())
+
+
+def title_case(text: str) -> str:
+    """'USES OF LIFE INSURANCE' -> 'Uses of Life Insurance', keeping small words lowercase."""
+    out = []
+    for i, word in enumerate(text.split()):
+        lower = word.lower()
+        out.append(lower if i and lower in SMALL_WORDS else lower.capitalize())
+    return ' '.join(out)
+
+
+class TitleTrie:
+    """Override titles keyed by their uppercase word sequence."""
+
+    def __init__(self, overrides=()):
+        self.root = {}
+        for override in overrides:
+            node = self.root
+            for word in words(override['match']):
+                node = node.setdefault(word, {})
+            node[_END] = override['title']
+
+    def longest(self, seq):
+        """(title, words matched) for the longest override prefixing seq, or (None, 0)."""
+        node = self.root
+        found = (None, 0)
+        for i, word in enumerate(seq):
+            node = node.get(word)
+            if node is None:
+                break
+            if _END in node:
+                found = (node[_END], i + 1)
+        return found
+
+
+def is_heading_line(line: str) -> bool:
+    return bool(line.strip()) and not line[:1].isspace() and line.isupper()
+
+
+def continues(title: str, line: str) -> bool:
+    """Whether line reads as the wrapped rest of a heading ending in title."""
+    if not is_heading_line(line):
+        return False
+    head = line.split()
+    return (title.rstrip().endswith(',') or words(title)[-1] in TRAILING_JOINERS
+            or head[0].upper() in LEADING_JOINERS or len(head) == 1)
+
+
+def detect_title(lines: list[str], trie: TitleTrie, styles=None) -> tuple[str, int]:
+    """
+    (title, number of lines it takes) for the lines following a chapter
+    marker. styles, if known, gives the heading style of each of the first
+    lines (None for body text).
+    """
+    head = lines[:MAX_TITLE_LINES]
+    seq = []
+    line_of = []  # index of the line each word came from
+    for i, line in enumerate(head):
+        seq += words(line)
+        line_of += [i] * (len(seq) - len(line_of))
+    title, matched = trie.longest(seq)
+    if title:
+        return title, line_of[matched - 1] + 1
+
+    text = lines[0].strip()
+    used = 1
+    if styles and styles[0]:
+        while used < len(head) and styles[used] == styles[0] and head[used].strip():
+            text = f"{text} {head[used].strip()}"
+            used += 1
+        return title_case(re.sub(r'\s+', ' ', text)), used
+    while used < len(head) and continues(text, head[used]):
+        text = f"{text} {head[used].strip()}"
+        used += 1
+    return title_case(re.sub(r'\s+', ' ', text)), used
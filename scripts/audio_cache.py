@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for generated course audio.
+
+Audio is stored once per hash of (normalized text, voice, backend version)
+under .audio_cache/objects/, and a small index maps each published file
+(path relative to public/courses/audio) to the hash it was built from.
+A rebuild only synthesizes pages whose text actually changed, and pages
+with identical text share one object.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_DIR = BASE_DIR / '.audio_cache'
+AUDIO_DIR = BASE_DIR / 'public' / 'courses' / 'audio'
+
+# Blank lines between paragraphs, as split_paragraph_chunks sees them
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so reflowed but otherwise identical text hashes the same."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def normalize_paragraphs(text: str) -> str:
+    """normalize_text per paragraph, keeping the breaks between them."""
+    return '\n\n'.join(filter(None, (normalize_text(para) for para in PARAGRAPH_BREAK.split(text))))
+
+
+def content_key(text: str, voice_name: str, backend_version: str, paragraphs=False) -> str:
+    """
+    Hash identifying the audio for this text, voice and backend. With
+    paragraphs, the paragraph layout is part of the key too, for backends
+    whose output depends on it (per-paragraph segments).
+    """
+    h = hashlib.sha256()
+    normalized = normalize_paragraphs(text) if paragraphs else normalize_text(text)
+    for part in (normalized, voice_name, backend_version):
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class AudioCache:
+    """Object store plus a page → hash index."""
+
+    def __init__(self, root: Path = CACHE_DIR, audio_dir: Path = AUDIO_DIR):
+        self.root = Path(root)
+        self.audio_dir = Path(audio_dir)
+        self.index_path = self.root / 'index.json'
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+
+    def object_path(self, key: str) -> Path:
+        return self.root / 'objects' / key[:2] / f"{key}.mp3"
+
+    def meta_path(self, key: str) -> Path:
+        """Sidecar with backend metadata (e.g. paragraph segments), if the backend produced any."""
+        return self.object_path(key).with_suffix('.json')
+
+    def load_meta(self, key: str):
+        path = self.meta_path(key)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def has(self, key: str) -> bool:
+        return self.object_path(key).exists()
+
+    def page_key(self, output_path: Path) -> str:
+        return Path(output_path).relative_to(self.audio_dir).as_posix()
+
+    def is_current(self, output_path: Path, key: str) -> bool:
+        """True if output_path exists and was built from this exact key."""
+        return self.index.get(self.page_key(output_path)) == key and Path(output_path).exists()
+
+    def materialize(self, key: str, output_path: Path):
+        """Publish a stored object at output_path (hardlink, or copy across devices)."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = output_path.with_name(output_path.name + '.tmp')
+        if tmp.exists():
+            tmp.unlink()
+        try:
+            os.link(self.object_path(key), tmp)
+        except OSError:
+            shutil.copyfile(self.object_path(key), tmp)
+        os.replace(tmp, output_path)
+        self.index[self.page_key(output_path)] = key
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.index_path)
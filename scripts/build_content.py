@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Incremental build of the whole content pipeline.
+
+The stages form a DAG over small artifacts:
+
+    pdf ─ingest─▶ raw text ─parse─▶ chapter ─reformat─▶ chapter ─split─▶ pages ─format─▶ page
+                                                                                         │
+                                        public/courses/<name>.json ◀─publish─────────────┤
+                                                                 audio per voice ◀─tts───┘
+
+Every artifact is stored under .build_cache/ by the hash of its inputs
+and the version of the stage that made it (each stage module's VERSION).
+A stage only runs on inputs it has not seen, so a typo fix re-reformats
+one chapter, re-splits it, re-formats its changed pages, and the TTS
+stage (already content-addressed per page and voice) re-renders only
+those pages. Courses build in parallel worker processes. A course with
+a "pdf" is first re-extracted (ingest_pdf.py) when its PDF changed.
+
+Usage:
+    python scripts/build_content.py [course ...] [--dry-run] [--tts [--backend offline]]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / 'courses'))  # course stage modules live there
+
+import final_format  # noqa: E402
+import ingest_pdf  # noqa: E402
+import parse_courses_v3  # noqa: E402
+import reformat_content_final  # noqa: E402
+import split_into_pages  # noqa: E402
+from course_registry import (formatted_path, lines_path, load_registry, parsed_path,  # noqa: E402
+                             public_path, source_path)
+from json_stream import JSONStream, iter_items  # noqa: E402
+
+BUILD_DIR = BASE_DIR / '.build_cache'
+
+# Stage name → module whose VERSION keys its artifacts
+STAGES = {
+    'parse': parse_courses_v3,
+    'reformat': reformat_content_final,
+    'split': split_into_pages,
+    'format': final_format,
+}
+
+
+class ArtifactStore:
+    """JSON artifacts addressed by (stage, stage version, inputs)."""
+
+    def __init__(self, root: Path = BUILD_DIR, dry_run=False):
+        self.root = Path(root)
+        self.dry_run = dry_run
+        self.counts = {stage: [0, 0] for stage in STAGES}  # [reused, built]
+
+    def key(self, stage: str, inputs) -> str:
+        h = hashlib.sha256()
+        h.update(f"{stage}/{STAGES[stage].VERSION}\0".encode('utf-8'))
+        h.update(json.dumps(inputs, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        return h.hexdigest()
+
+    def path(self, stage: str, key: str) -> Path:
+        return self.root / stage / key[:2] / f"{key}.json"
+
+    def run(self, stage: str, fn, *inputs):
+        """fn(*inputs), reused from the store when these inputs were built before."""
+        key = self.key(stage, inputs)
+        path = self.path(stage, key)
+        if path.exists():
+            self.counts[stage][0] += 1
+            with open(path) as f:
+                return json.load(f)
+        value = fn(*inputs)
+        self.counts[stage][1] += 1
+        if not self.dry_run:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        return value
+
+    def stream(self, stage: str, fn, *inputs):
+        """
+        Like run() for a stage that yields a sequence, one item at a time:
+        the artifact is JSONL, written and read back a line per item.
+        """
+        key = self.key(stage, inputs)
+        path = self.path(stage, key).with_suffix('.jsonl')
+        if path.exists():
+            self.counts[stage][0] += 1
+            with open(path) as f:
+                for line in f:
+                    yield json.loads(line)
+            return
+        self.counts[stage][1] += 1
+        if self.dry_run:
+            yield from fn(*inputs)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'w') as f:
+                for item in fn(*inputs):
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+                    yield item
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file, read in blocks so large raw sources are never held whole."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def source_digests(course: dict) -> list[str]:
+    """What a course parses from: its raw text, plus the PDF line records (heading styles) if ingested."""
+    paths = [source_path(course)]
+    if course.get('pdf') and lines_path(course).exists():
+        paths.append(lines_path(course))
+    return [file_digest(path) for path in paths]
+
+
+def parse_source(digests: list[str], course: dict):
+    """Parse stage: chapters streamed from the course's raw text (the digests only key the artifact)."""
+    return parse_courses_v3.iter_course(course)
+
+
+def page_digest(page: dict) -> str:
+    """Hash of a page minus its source range, which moves whenever text before it does."""
+    page = {key: value for key, value in page.items() if key != 'source'}
+    return hashlib.sha256(json.dumps(page, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def build_course(course: dict, dry_run=False) -> dict:
+    """
+    Build one course through every text stage, a chapter at a time, so
+    memory is bounded by the largest chapter; runs in a worker process.
+    """
+    store = ArtifactStore(dry_run=dry_run)
+    old_pages = {}
+    if public_path(course).exists():
+        old_pages = {page['id']: page_digest(page) for page in iter_items(public_path(course), 'pages')}
+
+    page_ids = set()
+    changed_pages = 0
+    with JSONStream(parsed_path(course), 'chapters') as parsed, \
+            JSONStream(formatted_path(course), 'chapters', ensure_ascii=False) as formatted, \
+            JSONStream(public_path(course), 'pages', ensure_ascii=False) as published:
+        for chapter in store.stream('parse', parse_source, source_digests(course), course):
+            parsed.add(chapter)
+            # Cached stages see only text, so moving a chapter within the raw file
+            # reuses them; source ranges are mapped back outside the store
+            chapter = reformat_content_final.reformat_chapter(
+                chapter, store.run('reformat', reformat_content_final.reformat_with_lines, chapter['content']))
+            formatted.add(chapter)
+
+            split = store.run('split', split_into_pages.split_into_pages, chapter['content'], chapter['title'])
+            for page in split_into_pages.locate_pages(split, chapter['paragraphs']):
+                page = dict(page, content=store.run('format', final_format.format_content, page['content']))
+                published.add(page)
+                page_ids.add(page['id'])
+                changed_pages += old_pages.get(page['id']) != page_digest(page)
+
+        head = parse_courses_v3.course_head(course, parsed.count)
+        parsed.finish(head, dry_run)
+        formatted.finish(head, dry_run)
+        changed = published.finish(split_into_pages.published_head(head, published.count), dry_run)
+    return {
+        'counts': store.counts,
+        'published': changed,
+        'pages': published.count,
+        'changed_pages': changed_pages,
+        'removed_pages': len(set(old_pages) - page_ids),
+    }
+
+
+def run_tts(backend_name: str):
+    """Render audio for new or changed pages; unchanged pages hit the audio cache."""
+    from audio_cache import AudioCache
+    from generate_all_voices import JOURNAL_PATH, generate, load_courses, make_backend, report_failures
+    from manifest_builder import update_manifest
+    from timing_index import report_timings, write_timings
+    from tts_backends import get_backend
+    from tts_chunking import DEFAULT_CHUNK_WORDS
+    from tts_journal import JobJournal
+    from voices import VOICES
+
+    pages = load_courses()
+    journal = JobJournal(JOURNAL_PATH)
+    stats = asyncio.run(generate(pages, VOICES, make_backend(get_backend(backend_name), DEFAULT_CHUNK_WORDS),
+                                 AudioCache(), journal))
+    report_failures(journal)
+    journal.close()
+    report_timings(*write_timings(pages, VOICES))
+    update_manifest()
+    print(f"🎤 {stats.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild course content (and audio)")
+    parser.add_argument('courses', nargs='*', help="course names or IDs (default: every registered course)")
+    parser.add_argument('--dry-run', action='store_true', help="report what would change without writing")
+    parser.add_argument('--tts', action='store_true', help="also render audio for changed pages and update the manifest")
+    parser.add_argument('--backend', default='edge', help="TTS backend for --tts")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    courses = load_registry(args.courses)
+    for course in courses:
+        if course.get('pdf') and not ingest_pdf.is_current(course):
+            if args.dry_run:
+                print(f"📄 {course['name']}: {course['pdf']} changed, would re-extract")
+                continue
+            header = ingest_pdf.ingest_course(course, args.workers)
+            print(f"📄 {course['name']}: extracted {header['pages']} PDF pages → {header['lines']} lines")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(build_course, courses, [args.dry_run] * len(courses)))
+
+    for course, result in zip(courses, results):
+        stages = ', '.join(f"{stage} {built} built/{reused + built}" for stage, (reused, built) in result['counts'].items())
+        status = ('would change' if args.dry_run else 'updated') if result['published'] else 'unchanged'
+        print(f"📘 {course['name']}: {result['pages']} pages, {status} "
+              f"({result['changed_pages']} changed, {result['removed_pages']} removed)")
+        print(f"   {stages}")
+
+    if args.tts and not args.dry_run:
+        run_tts(args.backend)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Join page audio into one file per chapter.
+
+Pages that share an `original_chapter` (written by split_into_pages.py)
+are concatenated frame-by-frame, in page order, into
+<voice>/chapters/<course>_<chapter>.mp3. A sidecar
+<course>_<chapter>.json next to it holds the page markers:
+
+    {
+      "key": "<hash of the page audio it was built from>",
+      "courseId": ..., "chapter": "<chapter title>", "duration": seconds,
+      "pages": [{"id", "title", "start", "duration", "offset", "bytes"}, ...]
+    }
+
+`start` is the page's time offset in seconds and `offset`/`bytes` its
+byte range, so the player can keep one stream open for a whole chapter
+and still seek to or highlight a page. Chapters are rebuilt only when one
+of their pages changed.
+
+Usage:
+    python scripts/bundle_audio.py [voice ...]
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from audio_cache import AudioCache
+from course_catalog import load_published
+from manifest_builder import COURSES_DIR, update_manifest
+from mp3_frames import audio_frames
+from voices import VOICES
+
+
+def chapter_id(page_id: str) -> str:
+    """Chapter slug shared by a chapter's page IDs ('<chapter>_p<N>')."""
+    return re.sub(r'_p\d+$', '', page_id)
+
+
+def load_chapters(courses_dir: Path = COURSES_DIR) -> list[dict]:
+    """Every course's pages grouped by original_chapter, in reading order."""
+    chapters = []
+    for course in load_published(courses_dir):
+        by_title = {}
+        for page in course['pages']:
+            title = page.get('original_chapter') or page['title']
+            if title not in by_title:
+                by_title[title] = {
+                    'course_id': course['courseId'],
+                    'chapter_id': chapter_id(page['id']),
+                    'title': title,
+                    'pages': [],
+                }
+                chapters.append(by_title[title])
+            by_title[title]['pages'].append(page)
+    return chapters
+
+
+def source_key(cache: AudioCache, path: Path) -> str:
+    """What a page file was built from: its cache key, or size and mtime for audio made outside the cache."""
+    key = cache.index.get(cache.page_key(path))
+    if key:
+        return key
+    st = path.stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def bundle_chapter(chapter: dict, sources: list[Path], out_path: Path, key: str):
+    """Concatenate the chapter's page files and write the audio plus its marker sidecar."""
+    audio = bytearray()
+    markers = []
+    start = 0.0
+    for page, source in zip(chapter['pages'], sources):
+        data = source.read_bytes()
+        offset = len(audio)
+        seconds = 0.0
+        for frame in audio_frames(data):
+            audio += data[frame.offset:frame.offset + frame.length]
+            seconds += frame.samples / frame.sample_rate
+        markers.append({
+            'id': page['id'],
+            'title': page['title'],
+            'start': round(start, 3),
+            'duration': round(seconds, 3),
+            'offset': offset,
+            'bytes': len(audio) - offset,
+        })
+        start += seconds
+
+    index = {
+        'key': key,
+        'courseId': chapter['course_id'],
+        'chapter': chapter['title'],
+        'duration': round(start, 3),
+        'pages': markers,
+    }
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + '.tmp')
+    tmp.write_bytes(audio)
+    os.replace(tmp, out_path)
+    # Sidecar last: its key marks the bundle as complete
+    index_path = out_path.with_suffix('.json')
+    tmp = index_path.with_name(index_path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, index_path)
+
+
+def bundle_voice(voice_id: str, chapters: list[dict], cache: AudioCache) -> tuple[int, int]:
+    """Bundle every chapter of a voice; returns (written, chapters with missing pages)."""
+    written = 0
+    incomplete = 0
+    voice_dir = cache.audio_dir / voice_id
+    for chapter in chapters:
+        sources = [voice_dir / f"{chapter['course_id']}_{page['id']}.mp3" for page in chapter['pages']]
+        if not all(source.exists() for source in sources):
+            incomplete += 1
+            continue
+        h = hashlib.sha256()
+        for source in sources:
+            h.update(source_key(cache, source).encode('utf-8'))
+            h.update(b'\0')
+        key = h.hexdigest()
+
+        out_path = voice_dir / 'chapters' / f"{chapter['course_id']}_{chapter['chapter_id']}.mp3"
+        index_path = out_path.with_suffix('.json')
+        if out_path.exists() and index_path.exists():
+            with open(index_path) as f:
+                if json.load(f).get('key') == key:
+                    continue
+        bundle_chapter(chapter, sources, out_path, key)
+        written += 1
+    return written, incomplete
+
+
+def bundle_all(voices, cache: AudioCache = None, log=print):
+    cache = cache or AudioCache()
+    chapters = load_chapters()
+    for voice_id in voices:
+        written, incomplete = bundle_voice(voice_id, chapters, cache)
+        note = f", {incomplete} skipped with pages missing" if incomplete else ''
+        log(f"  [{voice_id}] {written} of {len(chapters)} chapters bundled{note}")
+
+
+if __name__ == '__main__':
+    voices = sys.argv[1:] or list(VOICES)
+    unknown = [v for v in voices if v not in VOICES]
+    if unknown:
+        print(f"Unknown voices: {unknown}. Options: {list(VOICES)}")
+        sys.exit(1)
+    print("📚 Bundling chapter audio")
+    bundle_all(voices)
+    update_manifest()
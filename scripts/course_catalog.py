@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Published courses, as listed by the course registry.
+
+The registry (courses/registry/, one JSON file per course) names every
+course; split_into_pages.py publishes each one as public/courses/<name>.json.
+The audio scripts and formatters iterate these instead of hardcoding
+course files.
+"""
+import json
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+REGISTRY_DIR = BASE_DIR / 'courses' / 'registry'
+COURSES_DIR = BASE_DIR / 'public' / 'courses'
+
+
+def course_paths(courses_dir: Path = COURSES_DIR) -> list[Path]:
+    """Published JSON of every registered course that has been built, in registry order."""
+    paths = []
+    for entry in sorted(REGISTRY_DIR.glob('*.json')):
+        with open(entry) as f:
+            name = json.load(f)['name']
+        path = Path(courses_dir) / f"{name}.json"
+        if path.exists():
+            paths.append(path)
+    return paths
+
+
+def load_published(courses_dir: Path = COURSES_DIR) -> list[dict]:
+    """Every published course ({courseId, title, description, pages})."""
+    courses = []
+    for path in course_paths(courses_dir):
+        with open(path) as f:
+            courses.append(json.load(f))
+    return courses
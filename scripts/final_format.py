@@ -4,6 +4,12 @@ Final comprehensive formatter for course JSON files.
 """
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+from course_catalog import BASE_DIR, course_paths
+
+# Part of build_content.py's artifact keys: bump when output for the same input changes
+VERSION = '1'
 
 def split_inline_headers(content):
     """Separate headers that are stuck inline with other text."""
@@ -125,11 +131,13 @@ def process_file(filename):
         page['content'] = format_content(page['content'])
     
     with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+        json.dump(data, f, indent=2, ensure_ascii=False)
     
     return len(data.get('pages', []))
 
 if __name__ == '__main__':
-    for f in ['public/courses/florida_laws.json', 'public/courses/review_notes.json']:
-        n = process_file(f)
-        print(f"✓ {f}: {n} pages")
+    # Courses are independent, so each is formatted in its own process
+    paths = course_paths()
+    with ProcessPoolExecutor() as pool:
+        for path, n in zip(paths, pool.map(process_file, paths)):
+            print(f"✓ {path.relative_to(BASE_DIR)}: {n} pages")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Find and remove audio that no current course page references.
+
+Page IDs change when a course is re-split, and the old
+<voice>/<course>_<page>.mp3 files (plus their variants, segments, timings
+and chapter bundles) would otherwise ship forever. This compares the
+course JSONs with the audio tree, reports live and orphaned bytes per
+voice and per course, and by default changes nothing. --delete removes
+orphans; --quarantine moves them under .audio_cache/quarantine/ so they
+can be restored.
+
+Usage:
+    python scripts/gc_audio.py [voice ...] [--delete | --quarantine] [-v]
+"""
+import argparse
+import fnmatch
+import os
+import shutil
+import time
+from pathlib import Path
+
+from audio_cache import CACHE_DIR, AudioCache
+from bundle_audio import load_chapters
+from manifest_builder import AUDIO_DIR, VARIANT_FORMATS, current_pages, split_audio_name, update_manifest
+from sharding import PARTIAL_MANIFEST_GLOB
+from voices import VOICES
+
+QUARANTINE_DIR = CACHE_DIR / 'quarantine'
+# Top-level entries of the audio folder that are not voice folders
+SHARED = {'manifest.json', 'index.json', 'manifests', 'samples'}
+
+
+def live_stems(pages: dict) -> set[str]:
+    return {f"{course_id}_{page_id}" for course_id, ids in pages.items() for page_id in ids}
+
+
+def page_stem(rel: str) -> str:
+    """The '<course>_<page>' (or chapter) stem a file under a voice folder belongs to."""
+    parts = rel.split('/')
+    if parts[0] == 'segments' and len(parts) == 3:
+        return parts[1]
+    name = parts[-1]
+    return name.split('.', 1)[0]
+
+
+def is_live(rel: str, stems: set[str], chapters: set[str]) -> bool:
+    """Whether a path relative to a voice folder is still referenced by a current page or chapter."""
+    parts = rel.split('/')
+    name = parts[-1]
+    if name.endswith(('.part', '.tmp')) or name.startswith('.chunks-'):
+        return False  # left behind by an interrupted run
+    if len(parts) == 1:
+        return name.endswith('.mp3') and name[:-len('.mp3')] in stems
+    kind = parts[0]
+    if kind == 'variants' and len(parts) == 2:
+        stem = page_stem(rel)
+        return stem in stems and any(name == stem + spec['ext'] for spec in VARIANT_FORMATS.values())
+    if kind == 'segments' and len(parts) == 3:
+        return parts[1] in stems
+    if kind == 'timings' and len(parts) == 2:
+        return name.endswith('.json') and name[:-len('.json')] in stems
+    if kind == 'chapters' and len(parts) == 2:
+        return name.endswith(('.mp3', '.json')) and page_stem(rel) in chapters
+    return False
+
+
+def walk(root: Path):
+    """Yield (path relative to root, size) for every file under root."""
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            yield path.relative_to(root).as_posix(), path.stat().st_size
+
+
+def scan(voices, audio_dir: Path = AUDIO_DIR) -> tuple[dict, list[tuple[str, int]]]:
+    """
+    Account every file under the given voice folders. When every voice is
+    checked, folders of voices no longer offered, manifest slices of
+    removed courses and top-level page files (generate_audio.py's
+    single-voice layout) of removed pages count as orphaned too. Shard
+    partial manifests are left for merge_manifests.py.
+
+    Returns (usage, orphans): usage[voice][course] = [live files, live bytes,
+    orphaned files, orphaned bytes], and orphans as (path relative to the
+    audio folder, bytes).
+    """
+    pages = current_pages()
+    ids = list(pages)
+    stems = live_stems(pages)
+    chapters = {f"{c['course_id']}_{c['chapter_id']}" for c in load_chapters()}
+    everything = set(VOICES) <= set(voices)
+    usage = {}
+    orphans = []
+
+    for entry in sorted(audio_dir.iterdir()):
+        if entry.name in SHARED or fnmatch.fnmatch(entry.name, PARTIAL_MANIFEST_GLOB):
+            continue
+        voice_id = entry.name
+        if voice_id not in voices and not (everything and voice_id not in VOICES):
+            continue
+        if not entry.is_dir():
+            if not is_live(entry.name, stems, chapters):
+                orphans.append((voice_id, entry.stat().st_size))
+            continue
+        voice_known = voice_id in VOICES
+        for rel, size in walk(entry):
+            course_id, _ = split_audio_name(page_stem(rel), ids)
+            live = voice_known and is_live(rel, stems, chapters)
+            counts = usage.setdefault(voice_id, {}).setdefault(course_id or '(unknown)', [0, 0, 0, 0])
+            counts[0 if live else 2] += 1
+            counts[1 if live else 3] += size
+            if not live:
+                orphans.append((f"{voice_id}/{rel}", size))
+
+    # Slices of courses or voices that are gone
+    manifests_dir = audio_dir / 'manifests'
+    if everything and manifests_dir.is_dir():
+        for rel, size in walk(manifests_dir):
+            voice_id, _, name = rel.partition('/')
+            if voice_id not in VOICES or name[:-len('.json')] not in pages:
+                orphans.append((f"manifests/{rel}", size))
+    return usage, orphans
+
+
+def format_bytes(n: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{n:.0f}{unit}" if unit == 'B' else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+def report(usage: dict, orphans: list, verbose=False):
+    for voice_id, courses in usage.items():
+        live = sum(c[1] for c in courses.values())
+        dead = sum(c[3] for c in courses.values())
+        print(f"\n🎤 {voice_id}: {format_bytes(live)} live, {format_bytes(dead)} orphaned")
+        for course_id, (live_files, live_bytes, dead_files, dead_bytes) in sorted(courses.items()):
+            print(f"   {course_id}: {live_files} files ({format_bytes(live_bytes)}) live, "
+                  f"{dead_files} files ({format_bytes(dead_bytes)}) orphaned")
+
+    total = sum(size for _, size in orphans)
+    print(f"\n🗑️  {len(orphans)} orphaned files, {format_bytes(total)}")
+    shown = orphans if verbose else orphans[:20]
+    for rel, size in shown:
+        print(f"   {rel} ({format_bytes(size)})")
+    if len(shown) < len(orphans):
+        print(f"   ... and {len(orphans) - len(shown)} more (-v lists all)")
+
+
+def remove_empty_dirs(root: Path):
+    for dirpath, _, _ in sorted(os.walk(root), key=lambda w: -len(w[0])):
+        if Path(dirpath) != root and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def collect(orphans: list, audio_dir: Path = AUDIO_DIR, quarantine: Path = None):
+    """Delete orphans, or move them under quarantine keeping their relative paths."""
+    for rel, _ in orphans:
+        path = audio_dir / rel
+        if quarantine:
+            target = quarantine / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(path, target)
+        else:
+            path.unlink()
+    remove_empty_dirs(audio_dir)
+
+    # Forget cache index entries for published files that are gone
+    cache = AudioCache()
+    for page_key in [k for k in cache.index if not (audio_dir / k).exists()]:
+        del cache.index[page_key]
+    cache.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and remove audio no current page references")
+    parser.add_argument('voices', nargs='*', help="voices to check (default: all)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--delete', action='store_true', help="delete orphaned files")
+    mode.add_argument('--quarantine', action='store_true',
+                      help=f"move orphaned files under {QUARANTINE_DIR.relative_to(CACHE_DIR.parent)}/<timestamp>/")
+    parser.add_argument('-v', '--verbose', action='store_true', help="list every orphaned file")
+    args = parser.parse_args()
+
+    unknown = [v for v in args.voices if v not in VOICES]
+    if unknown:
+        parser.error(f"unknown voices: {unknown}; choose from {list(VOICES)}")
+    voices = args.voices or list(VOICES)
+
+    usage, orphans = scan(voices)
+    report(usage, orphans, args.verbose)
+    if not orphans:
+        return
+    if not (args.delete or args.quarantine):
+        print("\nDry run: nothing changed (use --delete or --quarantine)")
+        return
+
+    quarantine = QUARANTINE_DIR / time.strftime('%Y%m%d-%H%M%S') if args.quarantine else None
+    collect(orphans, quarantine=quarantine)
+    print(f"\n✅ {'Moved' if quarantine else 'Deleted'} {len(orphans)} files"
+          + (f" to {quarantine}" if quarantine else ''))
+    update_manifest()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,68 +1,50 @@
 #!/usr/bin/env python3
 """Generate course audio for one voice using Edge TTS."""
+import argparse
 import asyncio
-import json
-import sys
-import edge_tts
-from pathlib import Path
 
-VOICES = {
-    'aria': 'en-US-AriaNeural',
-    'jenny': 'en-US-JennyNeural', 
-    'michelle': 'en-US-MichelleNeural',
-    'christopher': 'en-US-ChristopherNeural',
-    'eric': 'en-US-EricNeural',
-    'guy': 'en-US-GuyNeural',
-}
+from audio_cache import AudioCache
+from bundle_audio import bundle_all
+from generate_all_voices import (
+    JOURNAL_PATH, add_generation_args, load_courses, make_backend, report_failures, write_partial_manifest,
+)
+from generate_all_voices import generate as generate_pages
+from segment_audio import segment_all
+from timing_index import report_timings, write_timings
+from tts_backends import TTSBackend, get_backend
+from tts_journal import JobJournal
+from voices import DEFAULT_VOICE, VOICES
 
-BASE_DIR = Path(__file__).parent.parent
-COURSES_DIR = BASE_DIR / 'public' / 'courses'
-AUDIO_DIR = COURSES_DIR / 'audio'
-
-def load_pages():
-    pages = []
-    for course_file, course_id in [('florida_laws.json', 'florida_laws_lh'), ('review_notes.json', 'review_notes_lh')]:
-        path = COURSES_DIR / course_file
-        with open(path) as f:
-            course = json.load(f)
-            for page in course['pages']:
-                pages.append({
-                    'course_id': course['courseId'],
-                    'chapter_id': page['id'],
-                    'content': page['content'],
-                })
-    return pages
-
-async def generate(voice_id):
+async def generate(voice_id, backend: TTSBackend, args):
     voice_name = VOICES[voice_id]
-    voice_dir = AUDIO_DIR / voice_id
-    voice_dir.mkdir(parents=True, exist_ok=True)
+    pages = load_courses()
+    
+    print(f"🎤 Generating {len(pages)} files for {voice_id} ({voice_name})", flush=True)
     
-    pages = load_pages()
-    total = len(pages)
+    journal = JobJournal(JOURNAL_PATH)
+    stats = await generate_pages(
+        pages, {voice_id: voice_name}, backend, AudioCache(), journal,
+        args.concurrency, args.per_voice, args.retries, args.rate, args.shard,
+        log=lambda msg: print(msg, flush=True),
+    )
+    report_failures(journal)
+    journal.close()
     
-    print(f"🎤 Generating {total} files for {voice_id} ({voice_name})", flush=True)
+    report_timings(*write_timings(pages, [voice_id]))
+    if args.segments:
+        segment_all([voice_id])
+    if args.bundle and not args.shard:
+        bundle_all([voice_id])
     
-    for i, page in enumerate(pages, 1):
-        filename = f"{page['course_id']}_{page['chapter_id']}.mp3"
-        output = voice_dir / filename
-        
-        if output.exists():
-            print(f"  [{i}/{total}] SKIP (exists): {page['chapter_id']}", flush=True)
-            continue
-        
-        try:
-            comm = edge_tts.Communicate(page['content'], voice_name)
-            await comm.save(str(output))
-            print(f"  [{i}/{total}] ✅ {page['chapter_id']}", flush=True)
-        except Exception as e:
-            print(f"  [{i}/{total}] ❌ {page['chapter_id']}: {e}", flush=True)
+    if args.shard:
+        write_partial_manifest({voice_id: voice_name}, args.shard, voice_id)
     
-    print(f"✅ {voice_id} complete!", flush=True)
+    print(f"✅ {voice_id} complete! {stats.summary()}", flush=True)
 
 if __name__ == '__main__':
-    voice = sys.argv[1] if len(sys.argv) > 1 else 'aria'
-    if voice not in VOICES:
-        print(f"Unknown voice: {voice}. Options: {list(VOICES.keys())}")
-        sys.exit(1)
-    asyncio.run(generate(voice))
+    parser = argparse.ArgumentParser(description="Generate course audio for one voice")
+    parser.add_argument('voice', nargs='?', default=DEFAULT_VOICE, choices=list(VOICES))
+    add_generation_args(parser)
+    args = parser.parse_args()
+    backend = make_backend(get_backend(args.backend), args.chunk_words, args.segments)
+    asyncio.run(generate(args.voice, backend, args))
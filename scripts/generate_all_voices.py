@@ -1,156 +1,226 @@
 #!/usr/bin/env python3
 """
 Generate course audio for all 6 voices using Edge TTS.
-100 pages × 6 voices = 600 audio files
+100 pages × 6 voices = 600 audio files, synthesized concurrently
+(see tts_engine.py for the scheduler).
 """
 
+import argparse
 import asyncio
-import json
-import os
-import sys
-import edge_tts
+import tempfile
 from pathlib import Path
 
-# Voice mapping
-VOICES = {
-    'aria': 'en-US-AriaNeural',
-    'jenny': 'en-US-JennyNeural', 
-    'michelle': 'en-US-MichelleNeural',
-    'christopher': 'en-US-ChristopherNeural',
-    'eric': 'en-US-EricNeural',
-    'guy': 'en-US-GuyNeural',
-}
+from audio_cache import CACHE_DIR, AudioCache, content_key
+from bundle_audio import bundle_all
+from course_catalog import load_published
+from manifest_builder import ManifestBuilder, current_pages, update_manifest, write_manifest
+from segment_audio import segment_all
+from sharding import in_shard, parse_shard, partial_manifest_name
+from timing_index import report_timings, write_timings
+from tts_backends import BACKENDS, OfflineBackend, TTSBackend, get_backend
+from tts_chunking import DEFAULT_CHUNK_WORDS, ChunkedBackend
+from tts_engine import RunStats, TokenBucket, TTSEngine, TTSJob
+from tts_estimate import DurationEstimator, format_duration
+from tts_journal import JobJournal
+from tts_text import normalize_for_tts
+from voices import VOICES
 
 BASE_DIR = Path(__file__).parent.parent
 COURSES_DIR = BASE_DIR / 'public' / 'courses'
 AUDIO_DIR = COURSES_DIR / 'audio'
+JOURNAL_PATH = CACHE_DIR / 'journal.sqlite3'
 
-async def generate_audio(text: str, voice: str, output_path: Path):
-    """Generate audio file using Edge TTS"""
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(str(output_path))
+def plan_jobs(pages: list, voices: dict, cache: AudioCache, backend: TTSBackend, shard=None) -> list[TTSJob]:
+    """
+    Build page × voice jobs for audio that is missing or stale.
 
-async def process_voice(voice_id: str, voice_name: str, pages: list):
-    """Process all pages for a single voice"""
-    voice_dir = AUDIO_DIR / voice_id
-    voice_dir.mkdir(parents=True, exist_ok=True)
+    Pages whose audio is already in the cache are published right away;
+    pages sharing identical text and voice become a single job. With a
+    shard (i, N), only that shard's share of the jobs is planned.
+    """
+    jobs = {}
+    for voice_id, voice_name in voices.items():
+        for page in pages:
+            if not in_shard(page['course_id'], page['chapter_id'], voice_id, shard):
+                continue
+            # Output filename matches original structure
+            filename = f"{page['course_id']}_{page['chapter_id']}.mp3"
+            output_path = cache.audio_dir / voice_id / filename
+            text = normalize_for_tts(page['content'])
+            key = content_key(text, voice_name, backend.version, backend.paragraph_layout)
+            
+            if cache.is_current(output_path, key):
+                continue
+            if cache.has(key):
+                cache.materialize(key, output_path)
+                continue
+            
+            if key not in jobs:
+                jobs[key] = TTSJob(
+                    course_id=page['course_id'],
+                    page_id=page['chapter_id'],
+                    voice_id=voice_id,
+                    voice_name=voice_name,
+                    text=text,
+                    output_path=cache.object_path(key),
+                    cache_key=key,
+                )
+            jobs[key].targets.append(output_path)
+    return list(jobs.values())
+
+def publish_job(job: TTSJob, cache: AudioCache):
+    """Copy a finished job from the cache to every page that uses it"""
+    for target in job.targets:
+        cache.materialize(job.cache_key, target)
+
+async def generate(pages: list, voices: dict, backend: TTSBackend, cache: AudioCache,
+                   journal: JobJournal = None, concurrency=8, per_voice=3, retries=3,
+                   rate=0.0, shard=None, log=print) -> RunStats:
+    """Plan, run and publish every missing or stale page × voice job"""
+    if journal:
+        resumed = journal.resume()
+        if resumed:
+            log(f"↩️  Resuming {resumed} jobs interrupted by the last run")
     
-    total = len(pages)
-    completed = 0
+    jobs = plan_jobs(pages, voices, cache, backend, shard)
+    if journal:
+        journal.add(jobs)
+    log(f"🎤 {len(jobs)} files to generate across {len(voices)} voices "
+        f"(concurrency {concurrency}, {per_voice} per voice)")
     
-    for page in pages:
-        course_id = page['course_id']
-        chapter_id = page['chapter_id']
-        content = page['content']
-        
-        # Output filename matches original structure
-        filename = f"{course_id}_{chapter_id}.mp3"
-        output_path = voice_dir / filename
-        
-        # Skip if already exists
-        if output_path.exists():
-            completed += 1
-            continue
-        
-        try:
-            await generate_audio(content, voice_name, output_path)
-            completed += 1
-            print(f"  [{voice_id}] {completed}/{total}: {chapter_id}")
-        except Exception as e:
-            print(f"  [{voice_id}] ERROR on {chapter_id}: {e}")
+    estimator = DurationEstimator.from_audio(pages, cache.audio_dir, VOICES)
+    for job in jobs:
+        job.estimate = estimator.estimate(job.words)
+    if jobs:
+        log(f"⏱️  Duration model: {estimator}; "
+            f"~{format_duration(sum(job.estimate for job in jobs))} of audio to synthesize")
     
-    return completed
+    engine = TTSEngine(
+        backend, concurrency, per_voice, retries=retries,
+        rate_limit=TokenBucket(rate, burst=concurrency) if rate else None,
+        journal=journal,
+        on_done=lambda job: publish_job(job, cache),
+        log=log,
+    )
+    try:
+        return await engine.run(jobs)
+    finally:
+        cache.save()
 
 def load_courses():
-    """Load all course pages"""
+    """Load the pages of every registered course"""
     pages = []
-    
-    # Florida Laws
-    fl_path = COURSES_DIR / 'florida_laws.json'
-    if fl_path.exists():
-        with open(fl_path) as f:
-            course = json.load(f)
-            for page in course['pages']:
-                pages.append({
-                    'course_id': course['courseId'],
-                    'chapter_id': page['id'],
-                    'content': page['content'],
-                    'title': page['title']
-                })
-    
-    # Review Notes
-    rn_path = COURSES_DIR / 'review_notes.json'
-    if rn_path.exists():
-        with open(rn_path) as f:
-            course = json.load(f)
-            for page in course['pages']:
-                pages.append({
-                    'course_id': course['courseId'],
-                    'chapter_id': page['id'],
-                    'content': page['content'],
-                    'title': page['title']
-                })
-    
+    for course in load_published():
+        for page in course['pages']:
+            pages.append({
+                'course_id': course['courseId'],
+                'chapter_id': page['id'],
+                'content': page['content'],
+                'title': page['title']
+            })
     return pages
 
-def update_manifest():
-    """Update manifest with multi-voice structure"""
-    manifest = {
-        'voices': list(VOICES.keys()),
-        'defaultVoice': 'aria',
-        'audio': {}
-    }
-    
-    for voice_id in VOICES.keys():
-        voice_dir = AUDIO_DIR / voice_id
-        if not voice_dir.exists():
-            continue
-            
-        manifest['audio'][voice_id] = {
-            'florida_laws_lh': {},
-            'review_notes_lh': {}
-        }
-        
-        for mp3_file in voice_dir.glob('*.mp3'):
-            filename = mp3_file.stem  # e.g., florida_laws_lh_chapter_id
-            
-            if filename.startswith('florida_laws_lh_'):
-                chapter_id = filename[16:]
-                manifest['audio'][voice_id]['florida_laws_lh'][chapter_id] = f"/courses/audio/{voice_id}/{mp3_file.name}"
-            elif filename.startswith('review_notes_lh_'):
-                chapter_id = filename[16:]
-                manifest['audio'][voice_id]['review_notes_lh'][chapter_id] = f"/courses/audio/{voice_id}/{mp3_file.name}"
-    
-    manifest_path = AUDIO_DIR / 'manifest.json'
-    with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
+def write_partial_manifest(voices: dict, shard, label: str = ''):
+    """Write the manifest entries for one shard's jobs, for merge_manifests.py"""
+    builder = ManifestBuilder()
+    builder.scan(voices)
+    pages = current_pages()
+    manifest = builder.build(
+        list(pages), list(voices),
+        include=lambda voice_id, course_id, page_id: in_shard(course_id, page_id, voice_id, shard),
+        pages=pages,
+    )
+    builder.save_index()
+    manifest['shard'] = list(shard)
     
-    print(f"\n✅ Manifest updated: {manifest_path}")
+    manifest_path = AUDIO_DIR / partial_manifest_name(shard, label)
+    write_manifest(manifest, manifest_path)
+    print(f"\n✅ Partial manifest written: {manifest_path}")
+
+def report_failures(journal: JobJournal):
+    """List jobs that are still failing after all retries"""
+    failures = journal.failures()
+    if not failures:
+        return
+    print(f"\n❌ {len(failures)} jobs failed (rerun to retry them):")
+    for job_key, attempts, error in failures:
+        print(f"   {job_key} ({attempts} attempts): {error}")
+
+def make_backend(backend: TTSBackend, chunk_words: int, segments=False) -> TTSBackend:
+    if segments:
+        return ChunkedBackend(backend, chunk_words or DEFAULT_CHUNK_WORDS, by_paragraph=True)
+    return ChunkedBackend(backend, chunk_words) if chunk_words else backend
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate course audio for all voices")
+    parser.add_argument('voice', nargs='?', choices=list(VOICES), help="only generate this voice")
+    add_generation_args(parser)
+    parser.add_argument('--benchmark', action='store_true',
+                        help="run against the offline backend into a temp dir and report throughput")
+    return parser.parse_args()
+
+def add_generation_args(parser: argparse.ArgumentParser):
+    """Options shared with gen_voice.py"""
+    parser.add_argument('--concurrency', type=int, default=8, help="max TTS requests in flight overall")
+    parser.add_argument('--per-voice', type=int, default=3, help="max TTS requests in flight per voice")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='edge', help="TTS backend to use")
+    parser.add_argument('--chunk-words', type=int, default=DEFAULT_CHUNK_WORDS,
+                        help="split pages into chunks of this many words synthesized in parallel (0 = whole pages)")
+    parser.add_argument('--retries', type=int, default=3, help="retries per job, with exponential backoff")
+    parser.add_argument('--rate', type=float, default=0.0, help="max TTS requests per second (0 = unlimited)")
+    parser.add_argument('--segments', action='store_true',
+                        help="synthesize per paragraph and write HLS-style segments and playlists")
+    parser.add_argument('--bundle', action='store_true',
+                        help="also join each chapter's pages into one file with page markers")
+    parser.add_argument('--shard', type=parse_shard, metavar='i/N',
+                        help="only generate shard i of N (1-based) and write a partial manifest")
 
 async def main():
-    # Check for specific voice argument
-    target_voice = sys.argv[1] if len(sys.argv) > 1 else None
+    args = parse_args()
     
     print("=" * 60)
-    print("GENERATING COURSE AUDIO - 6 VOICES")
+    print(f"GENERATING COURSE AUDIO - {len(VOICES)} VOICES")
     print("=" * 60)
     
     # Load all pages
     pages = load_courses()
     print(f"\nLoaded {len(pages)} pages from courses")
     
-    voices_to_process = {target_voice: VOICES[target_voice]} if target_voice else VOICES
+    voices_to_process = {args.voice: VOICES[args.voice]} if args.voice else VOICES
+    
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AudioCache(Path(tmp) / 'cache', Path(tmp) / 'audio')
+            backend = make_backend(OfflineBackend(), args.chunk_words, args.segments)
+            stats = await generate(pages, voices_to_process, backend, cache,
+                                   concurrency=args.concurrency, per_voice=args.per_voice,
+                                   retries=args.retries, rate=args.rate, log=lambda msg: None)
+        print(f"\n⏱️  Benchmark: {stats.summary()}")
+        return
+    
+    backend = make_backend(get_backend(args.backend), args.chunk_words, args.segments)
+    journal = JobJournal(JOURNAL_PATH)
+    stats = await generate(pages, voices_to_process, backend, AudioCache(), journal,
+                           args.concurrency, args.per_voice, args.retries, args.rate, args.shard)
+    report_failures(journal)
+    journal.close()
+    
+    report_timings(*write_timings(pages, voices_to_process))
+    if args.segments:
+        segment_all(voices_to_process)
+    if args.bundle:
+        if args.shard:
+            print("⚠️  --bundle needs every page of a chapter; run bundle_audio.py after merging shards")
+        else:
+            bundle_all(voices_to_process)
     
-    for voice_id, voice_name in voices_to_process.items():
-        print(f"\n🎤 Processing voice: {voice_id} ({voice_name})")
-        completed = await process_voice(voice_id, voice_name, pages)
-        print(f"✅ {voice_id}: {completed}/{len(pages)} files")
-        
-        # Update manifest after each voice completes
+    if args.shard:
+        write_partial_manifest(voices_to_process, args.shard, args.voice or '')
+    else:
         update_manifest()
     
     print("\n" + "=" * 60)
-    print("ALL VOICES COMPLETE!")
+    print(f"ALL VOICES COMPLETE! {stats.summary()}")
     print("=" * 60)
 
 if __name__ == '__main__':
@@ -1,24 +1,24 @@
 #!/usr/bin/env python3
 """Generate TTS audio for all course pages using Edge TTS."""
+import argparse
 import asyncio
 import json
 import os
-import edge_tts
+from pathlib import Path
 
-# Voice options - these are the best neural voices
-VOICE = "en-US-AriaNeural"  # Clear, professional female voice
-# Alternatives: "en-US-GuyNeural" (male), "en-US-JennyNeural" (female)
+from audio_cache import AudioCache, content_key
+from tts_backends import BACKENDS, TTSBackend, get_backend
+from tts_text import normalize_for_tts
+from voices import DEFAULT_VOICE, VOICES
+
+# Single-voice legacy layout; see generate_all_voices.py for per-voice folders
+VOICE = VOICES[DEFAULT_VOICE]
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "../public/courses/audio")
 COURSES_DIR = os.path.join(SCRIPT_DIR, "../public/courses")
 
-async def generate_page_audio(text: str, output_path: str, voice: str = VOICE):
-    """Generate audio for a single page."""
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(output_path)
-
-async def process_course(course_file: str):
+async def process_course(course_file: str, cache: AudioCache, backend: TTSBackend):
     """Process all pages in a course."""
     with open(os.path.join(COURSES_DIR, course_file), 'r') as f:
         course = json.load(f)
@@ -36,31 +36,40 @@ async def process_course(course_file: str):
         output_file = f"{course_id}_{page_id}.mp3"
         output_path = os.path.join(OUTPUT_DIR, output_file)
         
-        # Skip if already generated
-        if os.path.exists(output_path):
-            print(f"   ⏭️  Page {i+1}: {page['title']} (already exists)")
+        # Clean text for TTS
+        text = normalize_for_tts(page['content'])
+        
+        # Skip if already generated from the same text
+        key = content_key(text, VOICE, backend.version)
+        if cache.is_current(output_path, key):
+            print(f"   ⏭️  Page {i+1}: {page['title']} (unchanged)")
+            continue
+        if cache.has(key):
+            cache.materialize(key, output_path)
+            print(f"   ♻️  Page {i+1}: {page['title']} (cached)")
             continue
         
         print(f"   🎙️  Page {i+1}/{len(pages)}: {page['title']}...")
         
-        # Clean text for TTS
-        text = page['content']
-        # Silent pauses for bullets - just remove them (natural sentence flow)
-        text = text.replace('• ', '')
-        text = text.replace('◦ ', '')
-        text = text.replace('→', 'to')
-        text = text.replace('✓', 'check')
-        text = text.replace('—', ', ')
-        text = text.replace('–', ', ')
-        
         try:
-            await generate_page_audio(text, output_path)
+            object_path = cache.object_path(key)
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file so a crash never leaves a truncated object
+            part = object_path.with_name(object_path.name + '.part')
+            await backend.synthesize(text, VOICE, part)
+            os.replace(part, object_path)
+            cache.materialize(key, output_path)
             size_kb = os.path.getsize(output_path) / 1024
             print(f"      ✅ Generated: {output_file} ({size_kb:.0f}KB)")
         except Exception as e:
             print(f"      ❌ Error: {e}")
 
 async def main():
+    parser = argparse.ArgumentParser(description="Generate single-voice course audio")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='edge', help="TTS backend to use")
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+    
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     print("🎧 Edge TTS Audio Generator for GetMeALicense")
@@ -69,8 +78,10 @@ async def main():
     # Process all course files
     course_files = [f for f in os.listdir(COURSES_DIR) if f.endswith('.json')]
     
+    cache = AudioCache(audio_dir=Path(OUTPUT_DIR))
     for course_file in sorted(course_files):
-        await process_course(course_file)
+        await process_course(course_file, cache, backend)
+    cache.save()
     
     # Calculate total size
     mp3_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.mp3')]
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Incremental builder for public/courses/audio/manifest.json.
+
+Keeps an mtime/size index of every voice folder so only new or changed
+MP3s are read again. Alongside the `audio` URL map the reader already
+uses, the manifest gets a `files` map with each file's byte size,
+duration and content hash, so the reader can show durations and
+prefetch sizes without probing the audio. Transcoded variants,
+segment playlists and word timings are listed with each file when present,
+and chapter bundles under `chapters`. `voiceInfo` carries each voice's
+display details and preview clip from the voice registry.
+
+The combined manifest.json stays for backward compatibility; next to it,
+a small index.json lists one manifest per (voice, course) pair under
+manifests/, so the reader only fetches the slice it needs.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from audio_cache import CACHE_DIR
+from course_catalog import load_published
+from mp3_frames import duration_seconds
+from voices import DEFAULT_VOICE, VOICE_INFO, VOICES, sample_name
+
+BASE_DIR = Path(__file__).parent.parent
+COURSES_DIR = BASE_DIR / 'public' / 'courses'
+AUDIO_DIR = COURSES_DIR / 'audio'
+INDEX_PATH = CACHE_DIR / 'manifest_index.json'
+
+# Delivery variants written to <voice>/variants/ by transcode_audio.py
+VARIANT_FORMATS = {
+    'opus': {'ext': '.opus', 'type': 'audio/ogg; codecs=opus'},
+    'aac': {'ext': '.m4a', 'type': 'audio/mp4; codecs=mp4a.40.2'},
+    'mp3': {'ext': '.mp3', 'type': 'audio/mpeg'},
+}
+
+
+def current_pages(courses_dir: Path = COURSES_DIR) -> dict[str, set[str]]:
+    """Page IDs of every published course, by courseId."""
+    return {course['courseId']: {page['id'] for page in course['pages']} for course in load_published(courses_dir)}
+
+
+def voice_info(voices, audio_dir: Path = AUDIO_DIR) -> dict:
+    """Display details of each voice from the registry, with its preview clip if one was rendered."""
+    info = {}
+    for voice_id in voices:
+        voice = VOICE_INFO.get(voice_id)
+        if voice is None:
+            continue
+        info[voice_id] = {'name': voice.name, 'gender': voice.gender, 'description': voice.description}
+        if (Path(audio_dir) / 'samples' / sample_name(voice_id)).exists():
+            info[voice_id]['sample'] = f"/courses/audio/samples/{sample_name(voice_id)}"
+    return info
+
+
+def split_audio_name(stem: str, ids: list[str]):
+    """Split '<courseId>_<pageId>' using the known course IDs (longest match wins)."""
+    for course_id in sorted(ids, key=len, reverse=True):
+        if stem.startswith(course_id + '_'):
+            return course_id, stem[len(course_id) + 1:]
+    return None, None
+
+
+class ManifestBuilder:
+    """Scan voice folders incrementally and build the manifest from the index."""
+
+    def __init__(self, audio_dir: Path = AUDIO_DIR, index_path: Path = INDEX_PATH):
+        self.audio_dir = Path(audio_dir)
+        self.index_path = Path(index_path)
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+
+    def scan(self, voices=VOICES) -> int:
+        """Refresh index entries for the given voices; returns how many files were (re)read."""
+        seen = set()
+        reread = 0
+        for voice_id in voices:
+            voice_dir = self.audio_dir / voice_id
+            if not voice_dir.is_dir():
+                continue
+            with os.scandir(voice_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.mp3') or not entry.is_file():
+                        continue
+                    rel = f"{voice_id}/{entry.name}"
+                    seen.add(rel)
+                    st = entry.stat()
+                    cached = self.index.get(rel)
+                    if cached and cached['mtime_ns'] == st.st_mtime_ns and cached['bytes'] == st.st_size:
+                        continue
+                    data = Path(entry.path).read_bytes()
+                    self.index[rel] = {
+                        'mtime_ns': st.st_mtime_ns,
+                        'bytes': st.st_size,
+                        'duration': round(duration_seconds(data), 2),
+                        'sha256': hashlib.sha256(data).hexdigest(),
+                    }
+                    reread += 1
+        for rel in [r for r in self.index if r.split('/', 1)[0] in voices and r not in seen]:
+            del self.index[rel]
+        return reread
+
+    def build(self, ids: list[str], voices=VOICES, include=None, pages: dict = None) -> dict:
+        """
+        Build a manifest from the index. `include(voice_id, course_id, page_id)`
+        can restrict it to a subset, e.g. one shard's jobs. With `pages`
+        (see current_pages), audio for pages no course has any more is left out.
+        """
+        manifest = {
+            'voices': [],
+            'defaultVoice': DEFAULT_VOICE,
+            'audio': {},
+            'files': {},
+        }
+        unknown = 0
+        stale = 0
+        for rel in sorted(self.index):
+            voice_id, filename = rel.split('/', 1)
+            if voice_id not in voices:
+                continue
+            course_id, page_id = split_audio_name(filename[:-len('.mp3')], ids)
+            if course_id is None:
+                unknown += 1
+                continue
+            if pages is not None and page_id not in pages.get(course_id, ()):
+                stale += 1
+                continue
+            if include and not include(voice_id, course_id, page_id):
+                continue
+            entry = self.index[rel]
+            manifest['audio'].setdefault(voice_id, {}).setdefault(course_id, {})[page_id] = \
+                f"/courses/audio/{rel}"
+            info = {
+                'bytes': entry['bytes'],
+                'duration': entry['duration'],
+                'sha256': entry['sha256'],
+            }
+            stem = filename[:-len('.mp3')]
+            variants = self.variants(voice_id, stem)
+            if variants:
+                info['variants'] = variants
+            if (self.audio_dir / voice_id / 'segments' / stem / 'index.m3u8').exists():
+                info['playlist'] = f"/courses/audio/{voice_id}/segments/{stem}/index.m3u8"
+            if (self.audio_dir / voice_id / 'timings' / f"{stem}.json").exists():
+                info['timings'] = f"/courses/audio/{voice_id}/timings/{stem}.json"
+            manifest['files'].setdefault(voice_id, {}).setdefault(course_id, {})[page_id] = info
+        if unknown:
+            print(f"⚠️  {unknown} audio files do not match any course ID; left out of the manifest")
+        if stale:
+            print(f"⚠️  {stale} audio files belong to pages that no longer exist; left out of the manifest "
+                  f"(scripts/gc_audio.py removes them)")
+        manifest['voices'] = [v for v in voices if v in manifest['audio']]
+        manifest['voiceInfo'] = voice_info(voices, self.audio_dir)
+        # Chapter bundles span whole chapters, so they are left out of shard subsets
+        if include is None:
+            chapters = {v: self.chapters(v) for v in manifest['voices']}
+            chapters = {v: c for v, c in chapters.items() if c}
+            if chapters:
+                manifest['chapters'] = chapters
+        return manifest
+
+    def chapters(self, voice_id: str) -> dict:
+        """Chapter bundles written by bundle_audio.py, by course and chapter."""
+        found = {}
+        for index_path in sorted((self.audio_dir / voice_id / 'chapters').glob('*.json')):
+            audio = index_path.with_suffix('.mp3')
+            if not audio.exists():
+                continue
+            with open(index_path) as f:
+                index = json.load(f)
+            chapter_id = index_path.stem[len(index['courseId']) + 1:]
+            found.setdefault(index['courseId'], {})[chapter_id] = {
+                'title': index['chapter'],
+                'url': f"/courses/audio/{voice_id}/chapters/{audio.name}",
+                'markers': f"/courses/audio/{voice_id}/chapters/{index_path.name}",
+                'bytes': audio.stat().st_size,
+                'duration': index['duration'],
+                'pages': [page['id'] for page in index['pages']],
+            }
+        return found
+
+    def variants(self, voice_id: str, stem: str) -> dict:
+        """Transcoded variants of one file, smallest first."""
+        found = []
+        for fmt, spec in VARIANT_FORMATS.items():
+            path = self.audio_dir / voice_id / 'variants' / (stem + spec['ext'])
+            if path.exists():
+                found.append((path.stat().st_size, fmt, spec['type'], path.name))
+        return {
+            fmt: {'url': f"/courses/audio/{voice_id}/variants/{name}", 'type': mime, 'bytes': size}
+            for size, fmt, mime, name in sorted(found)
+        }
+
+    def save_index(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f, sort_keys=True)
+        os.replace(tmp, self.index_path)
+
+
+def write_manifest(manifest: dict, path: Path):
+    tmp = Path(path).with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def write_if_changed(data: dict, path: Path) -> bool:
+    """Write JSON only when its content changed, so unchanged slices keep their CDN cache."""
+    text = json.dumps(data, indent=2)
+    path = Path(path)
+    if path.exists() and path.read_text() == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(text)
+    os.replace(tmp, path)
+    return True
+
+
+def write_split_manifests(manifest: dict, audio_dir: Path = AUDIO_DIR) -> int:
+    """
+    Write manifests/<voice>/<course>.json per (voice, course) pair plus the
+    root index.json that points at them; returns how many slices changed.
+    """
+    audio_dir = Path(audio_dir)
+    index = {
+        'voices': manifest['voices'],
+        'defaultVoice': manifest['defaultVoice'],
+        'voiceInfo': manifest.get('voiceInfo', {}),
+        'manifests': {},
+    }
+    changed = 0
+    for voice_id in manifest['voices']:
+        for course_id, pages in manifest['audio'][voice_id].items():
+            files = manifest.get('files', {}).get(voice_id, {}).get(course_id, {})
+            part = {
+                'voice': voice_id,
+                'courseId': course_id,
+                'audio': pages,
+                'files': files,
+            }
+            chapters = manifest.get('chapters', {}).get(voice_id, {}).get(course_id)
+            if chapters:
+                part['chapters'] = chapters
+            changed += write_if_changed(part, audio_dir / 'manifests' / voice_id / f"{course_id}.json")
+            index['manifests'].setdefault(voice_id, {})[course_id] = {
+                'url': f"/courses/audio/manifests/{voice_id}/{course_id}.json",
+                # Changes whenever the slice does; usable as a cache-busting query string
+                'version': hashlib.sha256(json.dumps(part, sort_keys=True).encode('utf-8')).hexdigest()[:12],
+                'pages': len(pages),
+                'bytes': sum(f['bytes'] for f in files.values()),
+                'duration': round(sum(f['duration'] for f in files.values()), 2),
+            }
+    write_if_changed(index, audio_dir / 'index.json')
+    return changed
+
+
+def update_manifest(voices=VOICES, include=None, path: Path = AUDIO_DIR / 'manifest.json') -> dict:
+    """Rescan changed files and rewrite the manifest; returns the manifest."""
+    builder = ManifestBuilder()
+    reread = builder.scan(voices)
+    pages = current_pages()
+    manifest = builder.build(list(pages), voices, include, pages)
+    builder.save_index()
+    write_manifest(manifest, path)
+    changed = write_split_manifests(manifest, Path(path).parent)
+    print(f"\n✅ Manifest updated: {path} ({reread} files re-read, {changed} voice/course manifests changed)")
+    return manifest
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Merge per-shard partial manifests into public/courses/audio/manifest.json.
+
+Run after copying every shard's voice folders and manifest.shard-*.json
+files into the audio directory:
+
+    python scripts/merge_manifests.py
+"""
+import json
+import sys
+from pathlib import Path
+
+from manifest_builder import voice_info, write_manifest, write_split_manifests
+from sharding import PARTIAL_MANIFEST_GLOB
+from voices import DEFAULT_VOICE, VOICES
+
+BASE_DIR = Path(__file__).parent.parent
+AUDIO_DIR = BASE_DIR / 'public' / 'courses' / 'audio'
+
+
+def merge_manifests(paths: list[Path]) -> dict:
+    """Union the audio maps of partial manifests, keeping voices in registry order."""
+    audio = {}
+    files = {}
+    chapters = {}
+    shards_seen = {}
+    for path in paths:
+        with open(path) as f:
+            partial = json.load(f)
+        index, count = partial.get('shard', (1, 1))
+        shards_seen.setdefault(count, set()).add(index)
+        for voice_id, courses in partial['audio'].items():
+            for course_id, pages in courses.items():
+                audio.setdefault(voice_id, {}).setdefault(course_id, {}).update(pages)
+        for voice_id, courses in partial.get('files', {}).items():
+            for course_id, pages in courses.items():
+                files.setdefault(voice_id, {}).setdefault(course_id, {}).update(pages)
+        for voice_id, courses in partial.get('chapters', {}).items():
+            for course_id, bundles in courses.items():
+                chapters.setdefault(voice_id, {}).setdefault(course_id, {}).update(bundles)
+    
+    for count, seen in shards_seen.items():
+        missing = sorted(set(range(1, count + 1)) - seen)
+        if missing:
+            print(f"⚠️  Missing partial manifests for shards {missing} of {count}")
+    
+    voices = [v for v in VOICES if v in audio] + sorted(v for v in audio if v not in VOICES)
+    manifest = {
+        'voices': voices,
+        'defaultVoice': DEFAULT_VOICE,
+        'audio': {v: audio[v] for v in voices},
+        'files': {v: files[v] for v in voices if v in files},
+        'voiceInfo': voice_info(VOICES),
+    }
+    if chapters:
+        manifest['chapters'] = {v: chapters[v] for v in voices if v in chapters}
+    return manifest
+
+
+def main():
+    paths = [Path(p) for p in sys.argv[1:]] or sorted(AUDIO_DIR.glob(PARTIAL_MANIFEST_GLOB))
+    if not paths:
+        print(f"No partial manifests found in {AUDIO_DIR}")
+        sys.exit(1)
+    
+    manifest = merge_manifests(paths)
+    manifest_path = AUDIO_DIR / 'manifest.json'
+    write_manifest(manifest, manifest_path)
+    write_split_manifests(manifest, AUDIO_DIR)
+    
+    print(f"✅ Merged {len(paths)} partial manifests into {manifest_path}")
+    for voice_id, courses in manifest['audio'].items():
+        print(f"   {voice_id}: {sum(len(p) for p in courses.values())} files")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Minimal MP3 frame helpers.
+
+Edge TTS returns 24 kHz, 48 kbps mono MPEG-2 Layer III audio. These helpers
+build frames in that same format, walk the frames of an existing file and
+join files frame-by-frame without re-encoding.
+"""
+from collections import namedtuple
+
+SAMPLE_RATE = 24000
+BITRATE = 48000
+SAMPLES_PER_FRAME = 576  # MPEG-2 Layer III
+FRAME_SECONDS = SAMPLES_PER_FRAME / SAMPLE_RATE
+FRAME_BYTES = 72 * BITRATE // SAMPLE_RATE  # 144 bytes, no padding
+
+# sync + MPEG-2 + Layer III + no CRC | 48 kbps, 24 kHz, no padding | mono
+FRAME_HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+
+# Header, then all-zero side info and main data: a valid frame that decodes to silence
+SILENT_FRAME = FRAME_HEADER + bytes(FRAME_BYTES - len(FRAME_HEADER))
+
+# Layer III tables, indexed by the header's version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+Frame = namedtuple('Frame', 'offset length samples sample_rate')
+
+
+def silent_mp3(seconds: float) -> bytes:
+    """Return a silent MP3 stream lasting about `seconds` (at least one frame)."""
+    frames = max(1, round(seconds / FRAME_SECONDS))
+    return SILENT_FRAME * frames
+
+
+def parse_header(data: bytes, offset: int):
+    """Return the Layer III Frame starting at offset, or None if there is no valid header."""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2 = data[offset + 1], data[offset + 2]
+    version = (b1 >> 3) & 3
+    layer = (b1 >> 1) & 3
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    if version == 3:
+        bitrate = _BITRATES_V1[bitrate_index] * 1000
+        samples = 1152
+    else:
+        bitrate = _BITRATES_V2[bitrate_index] * 1000
+        samples = 576
+    length = samples // 8 * bitrate // sample_rate + padding
+    return Frame(offset, length, samples, sample_rate)
+
+
+def id3v2_size(data: bytes) -> int:
+    """Length of a leading ID3v2 tag, or 0."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def iter_frames(data: bytes):
+    """Yield every complete frame, skipping tags and resyncing over junk."""
+    pos = id3v2_size(data)
+    end = len(data)
+    while pos + 4 <= end:
+        frame = parse_header(data, pos)
+        if frame is None:
+            pos += 1
+            continue
+        if pos + frame.length > end:
+            return
+        yield frame
+        pos += frame.length
+
+
+def is_info_frame(data: bytes, frame: Frame) -> bool:
+    """True for a Xing/Info/VBRI header frame, which carries metadata rather than audio."""
+    mono = (data[frame.offset + 3] >> 6) == 3
+    if frame.samples == 1152:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    tag = data[frame.offset + 4 + side_info:frame.offset + 8 + side_info]
+    return tag in (b'Xing', b'Info') or data[frame.offset + 36:frame.offset + 40] == b'VBRI'
+
+
+def audio_frames(data: bytes):
+    """Yield the audio frames of a file, leaving out any Xing/Info header frame."""
+    for i, frame in enumerate(iter_frames(data)):
+        if i == 0 and is_info_frame(data, frame):
+            continue
+        yield frame
+
+
+def duration_seconds(data: bytes) -> float:
+    """Playing time of an MP3 stream, from its frame headers."""
+    return sum(f.samples / f.sample_rate for f in audio_frames(data))
+
+
+def concat_mp3(parts) -> bytes:
+    """Join MP3 streams frame-by-frame, dropping tags and Xing headers from each part."""
+    out = bytearray()
+    for data in parts:
+        for frame in audio_frames(data):
+            out += data[frame.offset:frame.offset + frame.length]
+    return bytes(out)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Render a preview clip of every registered voice.
+
+The same sample paragraph is synthesized for each voice in voices.py, in
+parallel through the TTS engine, and published as
+public/courses/audio/samples/<voice>_<gender>.mp3 for the voice picker.
+Clips are cached by text hash like page audio, so a voice is rendered
+again only when the sample text, the voice or the backend changes.
+
+Usage:
+    python scripts/preview_voices.py [voice ...] [--backend offline]
+"""
+import argparse
+import asyncio
+
+from audio_cache import AudioCache, content_key
+from manifest_builder import update_manifest
+from tts_backends import BACKENDS, get_backend
+from tts_engine import TTSEngine, TTSJob
+from tts_text import normalize_for_tts
+from voices import REGISTRY, VOICES, sample_name
+
+SAMPLE_TEXT = (
+    "Welcome to your Florida life and health insurance course. "
+    "In this lesson, we'll look at how an insurance contract is formed, "
+    "what the insurer promises in return for your premium, and why "
+    "insurable interest must exist when the policy is issued."
+)
+
+
+def plan_previews(voices, cache: AudioCache, backend, text: str = SAMPLE_TEXT) -> list[TTSJob]:
+    """Jobs for preview clips that are missing or stale; cached clips are published right away."""
+    text = normalize_for_tts(text)
+    jobs = []
+    for voice_id in voices:
+        output_path = cache.audio_dir / 'samples' / sample_name(voice_id)
+        key = content_key(text, VOICES[voice_id], backend.version)
+        if cache.is_current(output_path, key):
+            continue
+        if cache.has(key):
+            cache.materialize(key, output_path)
+            continue
+        jobs.append(TTSJob(
+            course_id='samples',
+            page_id=voice_id,
+            voice_id=voice_id,
+            voice_name=VOICES[voice_id],
+            text=text,
+            output_path=cache.object_path(key),
+            cache_key=key,
+            targets=[output_path],
+        ))
+    return jobs
+
+
+async def render_previews(voices, backend, cache: AudioCache = None, concurrency=6, log=print):
+    cache = cache or AudioCache()
+    jobs = plan_previews(voices, cache, backend)
+    log(f"🎧 {len(jobs)} preview clips to render ({len(voices) - len(jobs)} up to date)")
+    engine = TTSEngine(
+        backend, concurrency, per_voice=1,
+        on_done=lambda job: [cache.materialize(job.cache_key, target) for target in job.targets],
+        log=log,
+    )
+    try:
+        return await engine.run(jobs)
+    finally:
+        cache.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a preview clip for each voice")
+    parser.add_argument('voices', nargs='*', help="voices to render (default: all)")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='edge', help="TTS backend to use")
+    args = parser.parse_args()
+
+    unknown = [v for v in args.voices if v not in VOICES]
+    if unknown:
+        parser.error(f"unknown voices: {unknown}; choose from {list(VOICES)}")
+    voices = args.voices or [voice.id for voice in REGISTRY]
+
+    stats = asyncio.run(render_previews(voices, get_backend(args.backend)))
+    print(f"✅ Previews: {stats.summary()}")
+    update_manifest()
+
+
+if __name__ == '__main__':
+    main()
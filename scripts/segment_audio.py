@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Write segmented (HLS-style) audio for each page.
+
+Pages synthesized with paragraph segments (generate_all_voices.py
+--segments) carry a sidecar with the frame count of every paragraph. This
+stage cuts each page MP3 at those frame boundaries into
+<voice>/segments/<course>_<page>/NNN.mp3 and writes an index.m3u8 playlist
+next to them, so playback can start after the first paragraph and seeking
+jumps straight to a paragraph. No re-encoding is involved.
+
+Usage:
+    python scripts/segment_audio.py [voice ...]
+"""
+import math
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from audio_cache import AudioCache
+from mp3_frames import audio_frames
+from voices import VOICES
+
+PLAYLIST = 'index.m3u8'
+KEY_FILE = '.key'  # Cache key the segments were cut from
+
+
+def build_playlist(durations: list[float]) -> str:
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:3',
+        f"#EXT-X-TARGETDURATION:{math.ceil(max(durations, default=0))}",
+        '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:VOD',
+    ]
+    for i, seconds in enumerate(durations):
+        lines.append(f"#EXTINF:{seconds:.3f},")
+        lines.append(f"{i:03d}.mp3")
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def split_segments(data: bytes, segments: list[dict]) -> list[tuple[bytes, float]]:
+    """Cut an MP3 into consecutive runs of frames, one per segment."""
+    frames = list(audio_frames(data))
+    out = []
+    pos = 0
+    for i, segment in enumerate(segments):
+        # The last segment takes any remainder so no audio is dropped
+        run = frames[pos:] if i == len(segments) - 1 else frames[pos:pos + segment['frames']]
+        pos += segment['frames']
+        audio = b''.join(data[f.offset:f.offset + f.length] for f in run)
+        out.append((audio, sum(f.samples / f.sample_rate for f in run)))
+    return out
+
+
+def write_segments(data: bytes, segments: list[dict], out_dir: Path, key: str):
+    """Replace out_dir with freshly cut segments and their playlist."""
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=out_dir.parent, prefix='.segments-'))
+    durations = []
+    for i, (audio, seconds) in enumerate(split_segments(data, segments)):
+        (tmp / f"{i:03d}.mp3").write_bytes(audio)
+        durations.append(seconds)
+    (tmp / PLAYLIST).write_text(build_playlist(durations))
+    (tmp / KEY_FILE).write_text(key)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+
+
+def segment_voice(voice_id: str, cache: AudioCache) -> tuple[int, int]:
+    """Segment every published page of a voice; returns (written, pages without segment data)."""
+    written = 0
+    missing = 0
+    prefix = f"{voice_id}/"
+    for page_key, key in sorted(cache.index.items()):
+        if not page_key.startswith(prefix) or '/' in page_key[len(prefix):]:
+            continue
+        meta = cache.load_meta(key)
+        if not meta or 'segments' not in meta:
+            missing += 1
+            continue
+        stem = Path(page_key).stem
+        out_dir = cache.audio_dir / voice_id / 'segments' / stem
+        key_file = out_dir / KEY_FILE
+        if key_file.exists() and key_file.read_text() == key:
+            continue
+        write_segments(cache.object_path(key).read_bytes(), meta['segments'], out_dir, key)
+        written += 1
+    return written, missing
+
+
+def segment_all(voices, cache: AudioCache = None, log=print):
+    cache = cache or AudioCache()
+    for voice_id in voices:
+        written, missing = segment_voice(voice_id, cache)
+        note = f", {missing} pages without paragraph data (regenerate with --segments)" if missing else ''
+        log(f"  [{voice_id}] {written} pages segmented{note}")
+
+
+if __name__ == '__main__':
+    voices = sys.argv[1:] or list(VOICES)
+    unknown = [v for v in voices if v not in VOICES]
+    if unknown:
+        print(f"Unknown voices: {unknown}. Options: {list(VOICES)}")
+        sys.exit(1)
+    print("✂️  Writing paragraph segments")
+    segment_all(voices)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Deterministic sharding of the (course, page, voice) job space.
+
+`--shard 2/4` selects the jobs whose stable hash falls in shard 2 of 4, so
+audio generation can be split across machines, and the same command
+always selects the same jobs. Each shard writes a partial manifest that
+merge_manifests.py combines into the final manifest.json.
+"""
+import argparse
+import hashlib
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse 'i/N' (1-based) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {spec!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {count}")
+    return index, count
+
+
+def shard_of(course_id: str, page_id: str, voice_id: str, count: int) -> int:
+    """1-based shard for a job; stable across runs, machines and Python versions."""
+    digest = hashlib.sha1(f"{course_id}\0{page_id}\0{voice_id}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def in_shard(course_id: str, page_id: str, voice_id: str, shard) -> bool:
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(course_id, page_id, voice_id, count) == index
+
+
+# Matches every name partial_manifest_name produces
+PARTIAL_MANIFEST_GLOB = 'manifest.shard-*.json'
+
+
+def partial_manifest_name(shard, label: str = '') -> str:
+    """File name for a shard's partial manifest; label separates runs sharing a shard (e.g. per voice)."""
+    index, count = shard
+    suffix = f".{label}" if label else ''
+    return f"manifest.shard-{index}-of-{count}{suffix}.json"
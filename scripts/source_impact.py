@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Which pages and audio files an edit to a course's raw text affects.
+
+Every published page carries "source": the line and byte range of the raw
+file it was built from (see courses/source_map.py). This maps changed raw
+lines (given, or taken from `git diff` of the raw file against a revision,
+HEAD by default) to the pages whose range they touch, and lists each
+page's audio per voice: the page file, its variants, segments and timings,
+and the chapter bundle it is part of. Those are what a rebuild will
+regenerate; nothing is changed here.
+
+Usage:
+    python scripts/source_impact.py <course> [--lines 120-140 ...] [--rev HEAD]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+from bundle_audio import chapter_id
+from course_catalog import BASE_DIR, COURSES_DIR, REGISTRY_DIR
+from gc_audio import page_stem, walk
+from manifest_builder import AUDIO_DIR
+from voices import VOICES
+
+HUNK = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+', re.MULTILINE)
+
+
+def find_course(name: str) -> dict:
+    courses = []
+    for path in sorted(REGISTRY_DIR.glob('*.json')):
+        with open(path) as f:
+            courses.append(json.load(f))
+    for course in courses:
+        if name in (course['name'], course['courseId']):
+            return course
+    sys.exit(f"Unknown course: {name}. Options: {[c['name'] for c in courses]}")
+
+
+def parse_range(text: str) -> tuple[int, int]:
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def diff_ranges(path, rev: str) -> list[tuple[int, int]]:
+    """Line ranges of path at rev that differ from the working tree."""
+    out = subprocess.run(['git', 'diff', '-U0', rev, '--', str(path)], cwd=BASE_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    ranges = []
+    for match in HUNK.finditer(out):
+        start, count = int(match.group(1)), int(match.group(2) or 1)
+        # A pure insertion (count 0) goes between line start and the next
+        ranges.append((max(start, 1), start + 1) if count == 0 else (start, start + count - 1))
+    return ranges
+
+
+def affected_pages(pages: list[dict], ranges) -> list[dict]:
+    """Pages whose source lines overlap any of the ranges."""
+    hit = []
+    for page in pages:
+        source = page.get('source')
+        if source and any(first <= source['lines'][1] and last >= source['lines'][0] for first, last in ranges):
+            hit.append(page)
+    return hit
+
+
+def audio_files(course_id: str, pages: list[dict], voices=VOICES) -> dict[str, list[str]]:
+    """Per voice, the existing files (relative to the voice folder) built from these pages."""
+    stems = {f"{course_id}_{page['id']}" for page in pages}
+    chapters = {f"{course_id}_{chapter_id(page['id'])}" for page in pages}
+    files = {}
+    for voice_id in voices:
+        voice_dir = AUDIO_DIR / voice_id
+        if voice_dir.is_dir():
+            files[voice_id] = sorted(rel for rel, _ in walk(voice_dir)
+                                     if page_stem(rel) in (chapters if rel.startswith('chapters/') else stems))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map raw-text edits to the pages and audio they affect")
+    parser.add_argument('course', help="course name or ID")
+    parser.add_argument('--lines', nargs='+', type=parse_range, metavar='A-B',
+                        help="changed raw line ranges (default: git diff of the raw file)")
+    parser.add_argument('--rev', default='HEAD', help="revision the published pages were built from")
+    args = parser.parse_args()
+
+    course = find_course(args.course)
+    raw_path = BASE_DIR / 'courses' / course['source']
+    ranges = args.lines or diff_ranges(raw_path, args.rev)
+    if not ranges:
+        print(f"✅ {course['source']} matches {args.rev}; nothing to rebuild")
+        return
+
+    with open(COURSES_DIR / f"{course['name']}.json") as f:
+        published = json.load(f)
+    pages = affected_pages(published['pages'], ranges)
+    shown = ', '.join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
+    print(f"📍 {course['source']} lines {shown}: {len(pages)} of {len(published['pages'])} pages affected")
+    for page in pages:
+        first, last = page['source']['lines']
+        print(f"   • {page['id']} (lines {first}-{last})")
+
+    for voice_id, rels in audio_files(published['courseId'], pages).items():
+        if rels:
+            print(f"\n🔊 {voice_id}: {len(rels)} files")
+            for rel in rels:
+                print(f"   {rel}")
+
+
+if __name__ == '__main__':
+    main()
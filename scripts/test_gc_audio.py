@@ -0,0 +1,33 @@
+"""Tests for gc_audio.scan(); run with `python -m pytest scripts`."""
+import gc_audio
+from sharding import partial_manifest_name
+from voices import VOICES
+
+PAGES = {'florida_laws': ['intro', 'p2']}
+
+
+def scan_tree(tmp_path, monkeypatch, names):
+    monkeypatch.setattr(gc_audio, 'current_pages', lambda: PAGES)
+    monkeypatch.setattr(gc_audio, 'load_chapters', lambda: [])
+    for name in names:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x')
+    _, orphans = gc_audio.scan(list(VOICES), tmp_path)
+    return {rel for rel, _ in orphans}
+
+
+def test_keeps_partial_manifests(tmp_path, monkeypatch):
+    names = [partial_manifest_name((1, 2)), partial_manifest_name((2, 2), next(iter(VOICES)))]
+    assert scan_tree(tmp_path, monkeypatch, names) == set()
+
+
+def test_top_level_page_audio_checked_against_live_pages(tmp_path, monkeypatch):
+    names = ['florida_laws_intro.mp3', 'florida_laws_p2.mp3', 'florida_laws_gone.mp3', 'stray.txt']
+    assert scan_tree(tmp_path, monkeypatch, names) == {'florida_laws_gone.mp3', 'stray.txt'}
+
+
+def test_voice_folder_orphans(tmp_path, monkeypatch):
+    voice_id = next(iter(VOICES))
+    names = [f'{voice_id}/florida_laws_intro.mp3', f'{voice_id}/florida_laws_gone.mp3']
+    assert scan_tree(tmp_path, monkeypatch, names) == {f'{voice_id}/florida_laws_gone.mp3'}
@@ -0,0 +1,24 @@
+"""Tests for timing_index.write_timings(); run with `python -m pytest scripts`."""
+import json
+
+from audio_cache import AudioCache, content_key
+from timing_index import write_timings
+from tts_text import normalize_for_tts
+
+
+def test_rewrites_when_content_moves_but_audio_key_does_not(tmp_path):
+    cache = AudioCache(tmp_path / 'cache', tmp_path / 'audio')
+    page = {'course_id': 'c', 'chapter_id': 'p1', 'content': 'First paragraph text.'}
+    key = content_key(normalize_for_tts(page['content']), 'V', 'test')
+    cache.index['v/c_p1.mp3'] = key
+    cache.meta_path(key).parent.mkdir(parents=True)
+    cache.meta_path(key).write_text(json.dumps({'words': [[0, 100, 'First'], [100, 100, 'paragraph']]}))
+
+    assert write_timings([page], ['v'], cache) == (1, 0)
+    assert write_timings([page], ['v'], cache) == (0, 0)
+
+    page['content'] = '• ' + page['content']
+    assert write_timings([page], ['v'], cache) == (1, 0)
+    with open(tmp_path / 'audio' / 'v' / 'timings' / 'c_p1.json') as f:
+        start, end = json.load(f)['words'][:2]
+    assert page['content'][start:end] == 'First'
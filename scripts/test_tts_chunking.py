@@ -0,0 +1,68 @@
+"""Tests for ChunkedBackend retries and cache keys; run with `python -m pytest scripts`."""
+import asyncio
+from pathlib import Path
+
+import tts_chunking
+from audio_cache import content_key
+from mp3_frames import silent_mp3
+from tts_backends import TTSBackend
+from tts_chunking import ChunkedBackend
+from tts_engine import TTSEngine, TTSJob
+
+# Eight paragraphs of 20 words, one chunk each at max_words=20
+TEXT = '\n\n'.join(' '.join(f"p{i}w{j}" for j in range(20)) for i in range(8))
+
+
+class FlakyBackend(TTSBackend):
+    """Fails the first `failures[chunk]` calls for chunks starting with a given word."""
+
+    def __init__(self, failures: dict):
+        self.failures = dict(failures)
+        self.calls = 0
+        self.writes_after_failure = 0
+        self.failed = False
+
+    async def synthesize(self, text: str, voice_name: str, output_path: Path):
+        self.calls += 1
+        first = text.split()[0]
+        if self.failures.get(first, 0):
+            self.failures[first] -= 1
+            await asyncio.sleep(0)
+            self.failed = True
+            raise RuntimeError(f"flaky {first}")
+        await asyncio.sleep(0.01)
+        if self.failed and not Path(output_path).parent.exists():
+            self.writes_after_failure += 1
+        Path(output_path).write_bytes(silent_mp3(0.1))
+
+
+def run(backend: FlakyBackend, tmp_path, retries=3):
+    engine = TTSEngine(ChunkedBackend(backend, max_words=20), concurrency=4, retries=retries, log=lambda msg: None)
+    job = TTSJob('c', 'p1', 'v', 'V', TEXT, tmp_path / 'c_p1.mp3')
+    return asyncio.run(engine.run([job]))
+
+
+def test_failed_chunks_retry_individually(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_chunking, 'backoff_delay', lambda attempt: 0)
+    backend = FlakyBackend({'p2w0': 1, 'p5w0': 1})
+    stats = run(backend, tmp_path)
+    assert stats.completed == 1
+    assert backend.calls == 10
+
+
+def test_exhausted_chunk_fails_page_and_cancels_siblings(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_chunking, 'backoff_delay', lambda attempt: 0)
+    backend = FlakyBackend({'p0w0': 99})
+    stats = run(backend, tmp_path, retries=1)
+    assert stats.failed == 1
+    assert backend.failures['p0w0'] == 97  # tried once and retried once, not again by the engine
+    assert backend.writes_after_failure == 0
+    assert not list(tmp_path.glob('.chunks-*'))
+
+
+def test_paragraph_layout_is_part_of_segment_cache_key():
+    backend = ChunkedBackend(FlakyBackend({}), by_paragraph=True)
+    merged = TEXT.replace('\n\n', ' ', 1)
+    assert content_key(TEXT, 'V', backend.version, backend.paragraph_layout) != \
+        content_key(merged, 'V', backend.version, backend.paragraph_layout)
+    assert content_key(TEXT, 'V', 'v') == content_key(merged, 'V', 'v')
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Per-page word timing index from TTS word boundaries.
+
+Backends report word boundaries as (offset ms, duration ms, word) against
+the normalized text they spoke. This stage aligns those words with the
+normalized page text, maps them back to offsets in the page's `content`,
+and writes <voice>/timings/<course>_<page>.json:
+
+    {
+      "key": "<audio cache key>",
+      "content": "<sha256 of the page content>",
+      "words": [start, end, ms, duration_ms, start, end, ms, duration_ms, ...],
+      "paragraphs": [[start, end, ms], ...]
+    }
+
+`words` is a flat array of 4-tuples (character offsets into content, end
+exclusive). The audio key is built from normalized text, so a bullet or
+reflow edit keeps it but moves the offsets; a file is rewritten when
+either hash changes. `paragraphs` gives the audio offset of each \\n\\n paragraph, so
+the reader can highlight along with playback and seek to a clicked
+paragraph without decoding the MP3 or running its own TTS.
+"""
+import hashlib
+import json
+import os
+import sys
+
+from audio_cache import AudioCache
+from tts_chunking import PARAGRAPH
+from tts_text import normalize_with_offsets, source_span
+from voices import VOICES
+
+# How far ahead to look for the next spoken word before giving up on it
+SEARCH_WINDOW = 200
+
+
+def align_words(text: str, words: list) -> list[tuple[int, int, int, int]]:
+    """Find each spoken word in text, in order; returns (start, end, ms, duration_ms)."""
+    aligned = []
+    pos = 0
+    for ms, duration, word in words:
+        found = text.find(word, pos, pos + len(word) + SEARCH_WINDOW)
+        if found < 0:
+            continue
+        aligned.append((found, found + len(word), ms, duration))
+        pos = found + len(word)
+    return aligned
+
+
+def build_timings(content: str, words: list) -> dict:
+    """Timing index for one page, with offsets into its content."""
+    normalized, anchors = normalize_with_offsets(content)
+    flat = []
+    starts = []
+    for start, end, ms, duration in align_words(normalized, words):
+        start, end = source_span(anchors, start, end)
+        flat.extend((start, end, ms, duration))
+        starts.append((start, ms))
+
+    paragraphs = []
+    i = 0
+    for match in PARAGRAPH.finditer(content):
+        while i < len(starts) and starts[i][0] < match.start():
+            i += 1
+        if i < len(starts) and starts[i][0] < match.end():
+            paragraphs.append([match.start(), match.end(), starts[i][1]])
+    return {'words': flat, 'paragraphs': paragraphs}
+
+
+def write_timings(pages: list, voices, cache: AudioCache = None) -> tuple[int, int]:
+    """Write timing files for every published page; returns (written, pages without word data)."""
+    cache = cache or AudioCache()
+    written = 0
+    missing = 0
+    for voice_id in voices:
+        for page in pages:
+            stem = f"{page['course_id']}_{page['chapter_id']}"
+            key = cache.index.get(f"{voice_id}/{stem}.mp3")
+            if not key:
+                continue
+            content_hash = hashlib.sha256(page['content'].encode('utf-8')).hexdigest()
+            path = cache.audio_dir / voice_id / 'timings' / f"{stem}.json"
+            if path.exists():
+                with open(path) as f:
+                    stored = json.load(f)
+                if stored.get('key') == key and stored.get('content') == content_hash:
+                    continue
+            meta = cache.load_meta(key)
+            if not meta or 'words' not in meta:
+                missing += 1
+                continue
+            timings = {'key': key, 'content': content_hash, **build_timings(page['content'], meta['words'])}
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(timings, f, separators=(',', ':'))
+            os.replace(tmp, path)
+            written += 1
+    return written, missing
+
+
+def report_timings(written: int, missing: int, log=print):
+    note = f", {missing} pages have no word boundaries (regenerate their audio)" if missing else ''
+    log(f"⏱️  {written} timing files written{note}")
+
+
+if __name__ == '__main__':
+    from generate_all_voices import load_courses
+    voices = sys.argv[1:] or list(VOICES)
+    report_timings(*write_timings(load_courses(), voices))
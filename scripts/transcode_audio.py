@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Transcode generated course audio into smaller delivery variants.
+
+For every page MP3 in public/courses/audio/<voice>/, a local ffmpeg writes
+low-bitrate Opus and AAC versions plus a loudness-normalized MP3 into
+<voice>/variants/. Files are transcoded in parallel in a process pool and
+only when the source changed since the variant was built: each variant is
+recorded against its source's cache key (or sha256 for files the audio
+cache did not publish). Modification times are not used, since published
+MP3s are hardlinks that keep the time of their cache object. The manifest
+records each variant so the reader can pick the smallest format the
+browser supports.
+
+Usage:
+    python scripts/transcode_audio.py [voice ...] [--formats opus,aac,mp3] [--workers N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from audio_cache import CACHE_DIR, AudioCache
+from manifest_builder import VARIANT_FORMATS, update_manifest
+from voices import VOICES
+
+BASE_DIR = Path(__file__).parent.parent
+AUDIO_DIR = BASE_DIR / 'public' / 'courses' / 'audio'
+# Variant path (relative to AUDIO_DIR) → key of the source it was transcoded from
+VARIANT_INDEX = CACHE_DIR / 'variants.json'
+
+# ffmpeg output options per variant (extensions and MIME types are in manifest_builder).
+# Speech at 24 kHz mono: these bitrates stay clear while cutting size a lot.
+VARIANTS = {
+    'opus': ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', '-f', 'ogg'],
+    'aac': ['-c:a', 'aac', '-b:a', '32k', '-movflags', '+faststart', '-f', 'mp4'],
+    'mp3': ['-af', 'loudnorm=I=-16:TP=-1.5:LRA=11', '-ar', '24000',
+            '-c:a', 'libmp3lame', '-b:a', '48k', '-f', 'mp3'],
+}
+
+
+def variant_path(source: Path, fmt: str) -> Path:
+    return source.parent / 'variants' / (source.stem + VARIANT_FORMATS[fmt]['ext'])
+
+
+def variant_rel(source: Path, fmt: str) -> str:
+    return variant_path(source, fmt).relative_to(AUDIO_DIR).as_posix()
+
+
+def source_key(source: Path, cache: AudioCache) -> str:
+    """Cache key the published file was built from, or its sha256 if the cache did not publish it."""
+    key = cache.index.get(cache.page_key(source))
+    if key:
+        return key
+    with open(source, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def load_variant_index() -> dict:
+    if not VARIANT_INDEX.exists():
+        return {}
+    with open(VARIANT_INDEX) as f:
+        return json.load(f)
+
+
+def save_variant_index(index: dict):
+    # Drop entries for variants that no longer exist (e.g. removed by gc_audio.py)
+    index = {rel: key for rel, key in index.items() if (AUDIO_DIR / rel).exists()}
+    VARIANT_INDEX.parent.mkdir(parents=True, exist_ok=True)
+    tmp = VARIANT_INDEX.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp, VARIANT_INDEX)
+
+
+def transcode_file(source: str, formats: list[str]) -> tuple[str, list[str], dict]:
+    """
+    Write the given variants of one file.
+
+    Runs in a worker process; returns (source, formats written, errors by format).
+    """
+    source = Path(source)
+    written = []
+    errors = {}
+    for fmt in formats:
+        target = variant_path(source, fmt)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        part = target.with_name(target.name + '.part')
+        cmd = ['ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error', '-y',
+               '-i', str(source), '-ac', '1', *VARIANTS[fmt], str(part)]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            if part.exists():
+                part.unlink()
+            errors[fmt] = result.stderr.strip() or f"ffmpeg exited with {result.returncode}"
+            continue
+        os.replace(part, target)
+        written.append(fmt)
+    return str(source), written, errors
+
+
+def transcode_all(voices: list[str], formats: list[str], workers: int = None) -> dict:
+    """Transcode every page MP3 for these voices; returns counts."""
+    sources = []
+    for voice_id in voices:
+        voice_dir = AUDIO_DIR / voice_id
+        if voice_dir.is_dir():
+            sources.extend(sorted(voice_dir.glob('*.mp3')))
+
+    cache = AudioCache()
+    index = load_variant_index()
+    keys = {}
+    stale = {}
+    for source in sources:
+        keys[str(source)] = key = source_key(source, cache)
+        todo = [fmt for fmt in formats
+                if index.get(variant_rel(source, fmt)) != key or not variant_path(source, fmt).exists()]
+        if todo:
+            stale[str(source)] = todo
+
+    counts = {'files': len(sources), 'written': 0, 'failed': 0}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(transcode_file, source, todo) for source, todo in stale.items()]
+        for future in as_completed(futures):
+            source, written, errors = future.result()
+            counts['written'] += len(written)
+            for fmt in written:
+                index[variant_rel(Path(source), fmt)] = keys[source]
+            for fmt, error in errors.items():
+                counts['failed'] += 1
+                print(f"  ❌ {Path(source).relative_to(AUDIO_DIR)} → {fmt}: {error}")
+    save_variant_index(index)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode course audio into delivery variants")
+    parser.add_argument('voices', nargs='*', help="voices to transcode (default: all)")
+    parser.add_argument('--formats', default=','.join(VARIANTS),
+                        help=f"comma-separated variants to build (default: {','.join(VARIANTS)})")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    unknown = [v for v in args.voices if v not in VOICES]
+    if unknown:
+        parser.error(f"unknown voices: {unknown}; choose from {list(VOICES)}")
+    formats = [f for f in args.formats.split(',') if f]
+    unknown = [f for f in formats if f not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown formats: {unknown}; choose from {list(VARIANTS)}")
+    if not shutil.which('ffmpeg'):
+        print("❌ ffmpeg not found on PATH; install it to build audio variants")
+        sys.exit(1)
+
+    voices = args.voices or list(VOICES)
+    print(f"🎛️  Transcoding {', '.join(voices)} → {', '.join(formats)}")
+    counts = transcode_all(voices, formats, args.workers)
+    print(f"✅ {counts['files']} files checked, {counts['written']} variants written, {counts['failed']} failed")
+
+    update_manifest()
+
+
+if __name__ == '__main__':
+    main()
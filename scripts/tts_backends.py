@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+TTS backends shared by the audio generation scripts.
+
+Every backend exposes the same coroutine, synthesize(text, voice_name,
+output_path), plus a version string that goes into the audio cache key.
+EdgeBackend talks to the Microsoft service; OfflineBackend writes valid
+silent MP3s with realistic latency so the pipeline can be load-tested
+with no network.
+"""
+import asyncio
+import hashlib
+from pathlib import Path
+
+from mp3_frames import silent_mp3
+
+WORDS_PER_MINUTE = 150  # Typical neural voice speaking rate
+
+
+class TTSBackend:
+    """Base class for TTS backends."""
+    name = ''
+    version = ''
+    # True for backends that make several service requests per call. Their
+    # synthesize() takes a `slot` argument, a factory of async context
+    # managers that the caller's concurrency and rate limits hold around
+    # each request, and `retries`, how often each request is retried.
+    schedules_requests = False
+    # True when the output depends on where the paragraph breaks fall, so
+    # the audio cache key must keep them (see audio_cache.content_key)
+    paragraph_layout = False
+
+    async def synthesize(self, text: str, voice_name: str, output_path: Path):
+        """Write MP3 audio to output_path; may return a metadata dict to store alongside it."""
+        raise NotImplementedError
+
+
+class EdgeBackend(TTSBackend):
+    """
+    Microsoft Edge neural voices via edge_tts.
+
+    Audio is streamed to disk and the WordBoundary events that
+    Communicate.save() would discard are returned as
+    {'words': [[offset_ms, duration_ms, word], ...]}.
+    """
+    name = 'edge'
+    # Part of the audio cache key: bump when Edge output for the same text changes
+    # (2: word boundaries are captured alongside the audio)
+    version = 'edge-tts/2'
+
+    async def synthesize(self, text: str, voice_name: str, output_path: Path):
+        import edge_tts
+        try:
+            communicate = edge_tts.Communicate(text, voice_name, boundary='WordBoundary')
+        except TypeError:
+            # edge-tts < 7 has no boundary option and always sends WordBoundary events
+            communicate = edge_tts.Communicate(text, voice_name)
+        words = []
+        with open(output_path, 'wb') as f:
+            async for chunk in communicate.stream():
+                if chunk['type'] == 'audio':
+                    f.write(chunk['data'])
+                elif chunk['type'] == 'WordBoundary':
+                    # Offsets and durations arrive in 100 ns ticks
+                    words.append([chunk['offset'] // 10_000, chunk['duration'] // 10_000, chunk['text']])
+        return {'words': words}
+
+
+class OfflineBackend(TTSBackend):
+    """
+    Deterministic local stand-in for the TTS service.
+
+    Writes silent audio as long as the text would take to speak, with
+    evenly spaced word boundaries. Latency grows with the word count like
+    the real service (with a fixed per-text jitter), and at most `capacity`
+    requests are served at once.
+    """
+    name = 'offline'
+    version = 'offline/2'
+
+    def __init__(self, base_latency=0.05, per_word=0.001, capacity=32):
+        self.base_latency = base_latency
+        self.per_word = per_word
+        self.capacity = capacity
+        self._slots = None
+
+    def latency(self, text: str) -> float:
+        jitter = hashlib.sha256(text.encode('utf-8')).digest()[0] / 255  # 0..1, stable per text
+        return (self.base_latency + self.per_word * len(text.split())) * (0.75 + jitter / 2)
+
+    async def synthesize(self, text: str, voice_name: str, output_path: Path):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        async with self._slots:
+            await asyncio.sleep(self.latency(text))
+        words = text.split()
+        word_ms = 60_000 // WORDS_PER_MINUTE
+        Path(output_path).write_bytes(silent_mp3(len(words) * word_ms / 1000))
+        return {'words': [[i * word_ms, word_ms, word] for i, word in enumerate(words)]}
+
+
+BACKENDS = {
+    'edge': EdgeBackend,
+    'offline': OfflineBackend,
+}
+
+
+def get_backend(name: str) -> TTSBackend:
+    """Instantiate a backend by name ('edge' or 'offline')."""
+    return BACKENDS[name]()
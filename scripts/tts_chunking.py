@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Sentence-chunked synthesis for long pages.
+
+A page is split at paragraph breaks (and, for long paragraphs, at sentence
+ends) into chunks of at most `max_words` words. The chunks are synthesized
+in parallel and their MP3 frames are joined into one file without
+re-encoding. Each chunk is one service request: under TTSEngine it takes
+a request slot, so the engine's concurrency, per-voice and rate limits
+count chunks. A failed chunk is retried on its own, with backoff and a
+fresh slot per attempt; only when it has used all its retries does the
+page fail, and its other chunks are cancelled.
+"""
+import asyncio
+import re
+import tempfile
+from pathlib import Path
+
+from mp3_frames import audio_frames, concat_mp3
+from tts_backends import TTSBackend
+from tts_engine import backoff_delay
+
+DEFAULT_CHUNK_WORDS = 150
+
+SENTENCE_END = re.compile(r'(?<=[.!?:;])\s+')
+# A paragraph: everything between blank lines, without surrounding whitespace
+PARAGRAPH = re.compile(r'\S(?:(?:(?!\n\s*\n).)*\S)?', re.DOTALL)
+
+
+def pack(pieces: list[str], max_words: int) -> list[str]:
+    """Greedily join consecutive pieces into chunks of at most max_words words."""
+    chunks = []
+    current = []
+    current_words = 0
+    for piece in pieces:
+        words = len(piece.split())
+        if current and current_words + words > max_words:
+            chunks.append('\n\n'.join(current))
+            current = []
+            current_words = 0
+        current.append(piece)
+        current_words += words
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def split_sentences(para: str) -> list[str]:
+    return [s for s in SENTENCE_END.split(para) if s.strip()]
+
+
+def split_chunks(text: str, max_words: int = DEFAULT_CHUNK_WORDS) -> list[str]:
+    """Pack paragraphs (or their sentences) into chunks of at most max_words words."""
+    pieces = []
+    for para in text.split('\n\n'):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para.split()) <= max_words:
+            pieces.append(para)
+        else:
+            pieces.extend(split_sentences(para))
+    return pack(pieces, max_words)
+
+
+def split_paragraph_chunks(text: str, max_words: int = DEFAULT_CHUNK_WORDS) -> list[tuple[tuple[int, int], list[str]]]:
+    """
+    Split text into paragraphs, each with its own chunks, so chunk audio
+    can be regrouped at paragraph boundaries. Returns ((start, end), chunks)
+    per paragraph, where start/end are character offsets into text.
+    """
+    paragraphs = []
+    for match in PARAGRAPH.finditer(text):
+        para = match.group()
+        if len(para.split()) <= max_words:
+            chunks = [para]
+        else:
+            chunks = pack(split_sentences(para), max_words)
+        paragraphs.append(((match.start(), match.end()), chunks))
+    return paragraphs
+
+
+class ChunkedBackend(TTSBackend):
+    """
+    Wrap a backend so long texts are synthesized as parallel chunks.
+
+    Word boundaries reported by the inner backend are shifted onto the
+    joined file's timeline. With by_paragraph, chunks never span a
+    paragraph break and the metadata also carries the paragraph layout
+    ('segments': each paragraph's character span, frame count and
+    seconds), which segment_audio.py uses to cut per-paragraph segments.
+    """
+
+    schedules_requests = True
+
+    def __init__(self, inner: TTSBackend, max_words=DEFAULT_CHUNK_WORDS, concurrency=4, retries=3,
+                 by_paragraph=False):
+        self.inner = inner
+        self.max_words = max_words
+        # Chunks in flight and retries per chunk when called without a slot (outside TTSEngine)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.by_paragraph = by_paragraph
+        self.paragraph_layout = by_paragraph
+        self.name = inner.name
+        # Chunk boundaries change the audio, so they are part of the cache key
+        self.version = f"{inner.version}+chunks{max_words}" + ('+para' if by_paragraph else '')
+
+    async def synthesize(self, text: str, voice_name: str, output_path: Path, slot=None, retries=None):
+        if slot is None:
+            slots = asyncio.Semaphore(self.concurrency)
+            slot = lambda: slots
+        if retries is None:
+            retries = self.retries
+
+        async def synthesize_chunk(chunk: str, path: Path):
+            for attempt in range(retries + 1):
+                try:
+                    async with slot():
+                        return await self.inner.synthesize(chunk, voice_name, path)
+                except Exception:
+                    if attempt == retries:
+                        raise
+                # Back off without holding a slot
+                await asyncio.sleep(backoff_delay(attempt))
+
+        paragraphs = None
+        if self.by_paragraph:
+            paragraphs = split_paragraph_chunks(text, self.max_words)
+            chunks = [chunk for _, para_chunks in paragraphs for chunk in para_chunks]
+        else:
+            chunks = split_chunks(text, self.max_words)
+        if not chunks or (len(chunks) == 1 and paragraphs is None):
+            return await synthesize_chunk(text, output_path)
+
+        output_path = Path(output_path)
+
+        with tempfile.TemporaryDirectory(dir=output_path.parent, prefix='.chunks-') as tmp:
+            paths = [Path(tmp) / f"{i:03d}.mp3" for i in range(len(chunks))]
+            tasks = [asyncio.create_task(synthesize_chunk(chunk, path)) for chunk, path in zip(chunks, paths)]
+            try:
+                metas = await asyncio.gather(*tasks)
+            except BaseException:
+                # Stop the other chunks before their temp directory goes away
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            parts = [p.read_bytes() for p in paths]
+        output_path.write_bytes(concat_mp3(parts))
+
+        frames = [list(audio_frames(data)) for data in parts]
+        meta = {}
+
+        # Word boundaries, shifted by the length of the chunks before them
+        if any(m and 'words' in m for m in metas):
+            words = []
+            offset_ms = 0
+            for chunk_meta, chunk_frames in zip(metas, frames):
+                for ms, duration, word in (chunk_meta or {}).get('words', []):
+                    words.append([ms + offset_ms, duration, word])
+                offset_ms += round(sum(f.samples / f.sample_rate for f in chunk_frames) * 1000)
+            meta['words'] = words
+
+        if paragraphs is not None:
+            segments = []
+            i = 0
+            for (start, end), para_chunks in paragraphs:
+                para_frames = [f for chunk_frames in frames[i:i + len(para_chunks)] for f in chunk_frames]
+                i += len(para_chunks)
+                segments.append({
+                    'chars': [start, end],
+                    'frames': len(para_frames),
+                    'seconds': round(sum(f.samples / f.sample_rate for f in para_frames), 3),
+                })
+            meta['segments'] = segments
+        return meta or None
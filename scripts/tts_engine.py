@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Async job scheduler for course TTS.
+
+Runs page × voice jobs concurrently under a global limit and a per-voice
+limit on any backend from tts_backends.py, and reports the throughput it
+achieved.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tts_backends import TTSBackend
+from tts_estimate import format_duration
+from tts_journal import DONE, FAILED, PENDING, RUNNING, JobJournal
+
+
+@dataclass
+class TTSJob:
+    """One page rendered in one voice."""
+    course_id: str
+    page_id: str
+    voice_id: str
+    voice_name: str
+    text: str
+    output_path: Path
+    cache_key: str = ''
+    # Estimated audio seconds, used to schedule the longest jobs first
+    estimate: float = 0.0
+    # Published paths to fill from output_path once it has been synthesized
+    targets: list = field(default_factory=list)
+
+    @property
+    def key(self):
+        return f"{self.voice_id}/{self.course_id}_{self.page_id}"
+
+    @property
+    def words(self):
+        return len(self.text.split())
+
+
+@dataclass
+class RunStats:
+    """Totals for one engine run."""
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    words: int = 0
+    elapsed: float = 0.0
+    errors: dict = field(default_factory=dict)
+
+    @property
+    def jobs_per_minute(self):
+        return self.completed / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def words_per_second(self):
+        return self.words / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"{self.completed}/{self.total} jobs in {self.elapsed:.1f}s "
+                f"({self.jobs_per_minute:.1f} jobs/min, {self.words_per_second:.0f} words/s, "
+                f"{self.failed} failed)")
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base=1.0, cap=60.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TTSEngine:
+    """
+    Run TTS jobs with bounded global and per-voice concurrency.
+
+    Jobs start longest-estimate-first (LPT), so the run does not end with
+    one long page synthesizing alone, and progress lines carry an ETA
+    based on the estimated audio finished so far.
+
+    The limits and the optional token bucket apply to service requests.
+    A backend that splits a job into several requests (schedules_requests)
+    takes a request slot per request and retries each failed request
+    itself, and at most `concurrency` of its jobs are in progress at once.
+
+    Each job is written to a temporary file and renamed into place, so an
+    interrupted run never leaves a truncated output. Failures are retried
+    with exponential backoff (per request, not per job, on a backend that
+    schedules its own requests); an optional token bucket caps the request
+    rate and an optional journal records every state change.
+    """
+
+    def __init__(self, backend: TTSBackend, concurrency=8, per_voice=3, retries=3,
+                 rate_limit: TokenBucket = None, journal: JobJournal = None, on_done=None, log=print):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.per_voice = per_voice
+        self.retries = retries
+        self.rate_limit = rate_limit
+        self.journal = journal
+        self.on_done = on_done
+        self.log = log
+        self.global_limit = None
+        self.voice_limits = {}
+
+    @asynccontextmanager
+    async def request_slot(self, voice_id: str):
+        """Hold one service request's share of the per-voice, global and rate limits."""
+        voice_limit = self.voice_limits.setdefault(voice_id, asyncio.Semaphore(self.per_voice))
+        async with voice_limit, self.global_limit:
+            if self.rate_limit:
+                await self.rate_limit.acquire()
+            yield
+
+    def mark(self, job: TTSJob, state: str, error: str = None):
+        if self.journal:
+            self.journal.mark(job, state, error)
+
+    async def attempt(self, job: TTSJob):
+        """
+        Synthesize one job into a temp file and atomically move it into place.
+
+        Metadata returned by the backend is written to a .json sidecar first,
+        so it is always present once the audio is.
+        """
+        job.output_path.parent.mkdir(parents=True, exist_ok=True)
+        part = job.output_path.with_name(job.output_path.name + '.part')
+        try:
+            if self.backend.schedules_requests:
+                meta = await self.backend.synthesize(job.text, job.voice_name, part,
+                                                     slot=lambda: self.request_slot(job.voice_id),
+                                                     retries=self.retries)
+            else:
+                meta = await self.backend.synthesize(job.text, job.voice_name, part)
+            if meta:
+                sidecar = job.output_path.with_suffix('.json')
+                sidecar_part = sidecar.with_name(sidecar.name + '.part')
+                sidecar_part.write_text(json.dumps(meta))
+                os.replace(sidecar_part, sidecar)
+            os.replace(part, job.output_path)
+        finally:
+            if part.exists():
+                part.unlink()
+
+    async def run(self, jobs: list[TTSJob]) -> RunStats:
+        stats = RunStats(total=len(jobs))
+        self.global_limit = asyncio.Semaphore(self.concurrency)
+        self.voice_limits = {}
+        # Jobs in progress on a backend that takes request slots itself
+        job_limit = asyncio.Semaphore(self.concurrency)
+        per_voice_done = {}
+        per_voice_total = {}
+        for job in jobs:
+            per_voice_total[job.voice_id] = per_voice_total.get(job.voice_id, 0) + 1
+        total_estimate = sum(job.estimate for job in jobs)
+        done_estimate = 0.0
+
+        def eta() -> str:
+            elapsed = time.perf_counter() - start
+            if not done_estimate or not elapsed:
+                return ''
+            remaining = (total_estimate - done_estimate) * elapsed / done_estimate
+            return f" (ETA {format_duration(remaining)})"
+
+        async def run_job(job: TTSJob):
+            nonlocal done_estimate
+            # A backend that schedules its own requests has already retried each of them
+            retries = 0 if self.backend.schedules_requests else self.retries
+            for attempt in range(retries + 1):
+                try:
+                    slot = job_limit if self.backend.schedules_requests else self.request_slot(job.voice_id)
+                    async with slot:
+                        self.mark(job, RUNNING)
+                        await self.attempt(job)
+                    break
+                except Exception as e:
+                    if attempt == retries:
+                        stats.failed += 1
+                        stats.errors[job.key] = str(e)
+                        self.mark(job, FAILED, str(e))
+                        self.log(f"  [{job.voice_id}] ERROR on {job.page_id} after {attempt + 1} attempts: {e}")
+                        return
+                    self.mark(job, PENDING, str(e))
+                    # Back off without holding a concurrency slot
+                    await asyncio.sleep(backoff_delay(attempt))
+            self.mark(job, DONE)
+            if self.on_done:
+                self.on_done(job)
+            stats.completed += 1
+            stats.words += job.words
+            done_estimate += job.estimate
+            done = per_voice_done[job.voice_id] = per_voice_done.get(job.voice_id, 0) + 1
+            self.log(f"  [{job.voice_id}] {done}/{per_voice_total[job.voice_id]}: {job.page_id}{eta()}")
+
+        # Semaphore waiters are served in order, so starting tasks longest-first gives LPT
+        ordered = sorted(jobs, key=lambda job: job.estimate, reverse=True)
+        start = time.perf_counter()
+        await asyncio.gather(*(run_job(job) for job in ordered))
+        stats.elapsed = time.perf_counter() - start
+        return stats
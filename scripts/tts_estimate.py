@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Audio duration estimates for scheduling TTS jobs.
+
+Fits seconds = intercept + seconds_per_word × words on the MP3s already
+generated (durations read from frame headers), falling back to a typical
+speaking rate when there is nothing to fit. The estimates order the job
+queue longest-first and drive the ETA.
+"""
+from pathlib import Path
+
+from mp3_frames import duration_seconds
+from tts_backends import WORDS_PER_MINUTE
+from tts_text import normalize_for_tts
+
+MAX_SAMPLES = 120  # Reading every file is slow; a spread of pages is plenty for a line fit
+
+
+class DurationEstimator:
+    """Linear model of audio duration against word count."""
+
+    def __init__(self, intercept=0.0, seconds_per_word=60 / WORDS_PER_MINUTE, samples=0):
+        self.intercept = intercept
+        self.seconds_per_word = seconds_per_word
+        self.samples = samples
+
+    def estimate(self, words: int) -> float:
+        return max(0.0, self.intercept + self.seconds_per_word * words)
+
+    def __str__(self):
+        source = f"fitted on {self.samples} files" if self.samples else "default speaking rate"
+        return f"{self.intercept:.1f}s + {self.seconds_per_word:.3f}s/word ({source})"
+
+    @classmethod
+    def fit(cls, samples: list[tuple[int, float]]) -> 'DurationEstimator':
+        """Least-squares fit on (words, seconds) pairs."""
+        n = len(samples)
+        if n < 2:
+            return cls()
+        mean_w = sum(w for w, _ in samples) / n
+        mean_s = sum(s for _, s in samples) / n
+        var_w = sum((w - mean_w) ** 2 for w, _ in samples)
+        if not var_w:
+            return cls()
+        slope = sum((w - mean_w) * (s - mean_s) for w, s in samples) / var_w
+        if slope <= 0:
+            return cls()
+        return cls(mean_s - slope * mean_w, slope, n)
+
+    @classmethod
+    def from_audio(cls, pages: list, audio_dir: Path, voices) -> 'DurationEstimator':
+        """Fit on existing MP3s for these pages, sampling evenly across the corpus."""
+        candidates = []
+        for voice_id in voices:
+            for page in pages:
+                path = Path(audio_dir) / voice_id / f"{page['course_id']}_{page['chapter_id']}.mp3"
+                if path.exists():
+                    candidates.append((page, path))
+        step = max(1, len(candidates) // MAX_SAMPLES)
+        samples = []
+        for page, path in candidates[::step]:
+            seconds = duration_seconds(path.read_bytes())
+            if seconds:
+                samples.append((len(normalize_for_tts(page['content']).split()), seconds))
+        return cls.fit(samples)
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    return f"{minutes}m{seconds:02d}s"
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Persistent journal of TTS jobs.
+
+Records the state of every page × voice job in a SQLite file so that an
+interrupted run can be resumed exactly where it stopped, and failures stay
+visible instead of being lost in the console output.
+"""
+import sqlite3
+import time
+from pathlib import Path
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    cache_key  TEXT PRIMARY KEY,
+    job        TEXT NOT NULL,
+    state      TEXT NOT NULL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class JobJournal:
+    """SQLite-backed job states, keyed by the audio cache key."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(SCHEMA)
+        self.db.commit()
+
+    def resume(self) -> int:
+        """Return jobs left running by a crashed run to pending; returns how many."""
+        cur = self.db.execute(
+            "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?",
+            (PENDING, time.time(), RUNNING))
+        self.db.commit()
+        return cur.rowcount
+
+    def add(self, jobs):
+        """Record planned jobs as pending, keeping attempt counts from earlier runs."""
+        now = time.time()
+        self.db.executemany(
+            "INSERT INTO jobs (cache_key, job, state, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(cache_key) DO UPDATE SET job = excluded.job, state = excluded.state, "
+            "updated_at = excluded.updated_at",
+            [(job.cache_key, job.key, PENDING, now) for job in jobs])
+        self.db.commit()
+
+    def mark(self, job, state: str, error: str = None):
+        attempts = 1 if state == RUNNING else 0
+        self.db.execute(
+            "UPDATE jobs SET state = ?, attempts = attempts + ?, last_error = ?, updated_at = ? "
+            "WHERE cache_key = ?",
+            (state, attempts, error, time.time(), job.cache_key))
+        self.db.commit()
+
+    def counts(self) -> dict:
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+
+    def failures(self) -> list:
+        return self.db.execute(
+            "SELECT job, attempts, last_error FROM jobs WHERE state = ? ORDER BY job",
+            (FAILED,)).fetchall()
+
+    def close(self):
+        self.db.close()
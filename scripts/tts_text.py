@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Text normalization shared by every TTS entry point.
+
+Bullets and symbols are rewritten for natural speech and insurance
+acronyms are spelled the way they should be pronounced, all in a single
+compiled-regex pass. The normalized text is what gets synthesized and
+hashed into the audio cache key, so changing a rule here regenerates
+exactly the pages whose spoken text changes.
+"""
+import bisect
+import re
+
+# Symbols as they appear in the formatted course text
+SYMBOLS = {
+    # Silent pauses for bullets - just remove them (natural sentence flow)
+    '• ': '',
+    '◦ ': '',
+    '•': '',
+    '◦': '',
+    '\uf0a7': '',  # PDF bullet glyphs
+    '\uf09f': '',
+    '→': ' to ',
+    '✓': 'check',
+    '—': ', ',
+    '–': ', ',
+    '§': 'section ',
+}
+
+# Pronunciation lexicon: whole words, case-sensitive
+LEXICON = {
+    'SGLI': 'S G L I',
+    'VGLI': 'V G L I',
+    'FEGLI': 'Feegly',
+    'HIPAA': 'Hippa',
+    'COBRA': 'Cobra',
+    'ERISA': 'Eh-risa',
+    'OBRA': 'Obra',
+    'TEFRA': 'Teffra',
+    'MIB': 'M I B',
+    'OIR': 'O I R',
+    'DFS': 'D F S',
+    'CFO': 'C F O',
+    'NAIC': 'N A I C',
+    'FINRA': 'Finra',
+    'IRA': 'I R A',
+    'ADL': 'A D L',
+    'ADLs': 'A D Ls',
+    'e.g.': 'for example',
+    'i.e.': 'that is',
+}
+
+REPLACEMENTS = {**SYMBOLS, **LEXICON}
+
+
+def _alternative(key: str) -> str:
+    escaped = re.escape(key)
+    # Word entries only match whole words; symbols match anywhere
+    if key[0].isalnum():
+        escaped = r'\b' + escaped
+    if key[-1].isalnum():
+        escaped += r'\b'
+    return escaped
+
+
+# Longest first so '• ' wins over '•' and 'ADLs' over 'ADL'
+_PATTERN = re.compile('|'.join(_alternative(k) for k in sorted(REPLACEMENTS, key=len, reverse=True)))
+
+
+def normalize_for_tts(text: str) -> str:
+    """Rewrite course text for speech in one pass; paragraph breaks are kept."""
+    return _PATTERN.sub(lambda m: REPLACEMENTS[m.group()], text)
+
+
+def normalize_with_offsets(text: str) -> tuple[str, list[tuple[int, int]]]:
+    """
+    normalize_for_tts, plus anchors (normalized offset, source offset) at
+    every replacement boundary, for mapping positions back with source_span().
+    """
+    out = []
+    anchors = [(0, 0)]
+    pos = 0
+    last = 0
+    for match in _PATTERN.finditer(text):
+        out.append(text[last:match.start()])
+        pos += match.start() - last
+        anchors.append((pos, match.start()))
+        replacement = REPLACEMENTS[match.group()]
+        out.append(replacement)
+        pos += len(replacement)
+        anchors.append((pos, match.end()))
+        last = match.end()
+    out.append(text[last:])
+    return ''.join(out), anchors
+
+
+def source_span(anchors: list[tuple[int, int]], start: int, end: int) -> tuple[int, int]:
+    """
+    Map a span of normalized text back to the source text. A span touching
+    a replacement grows to cover the whole text it replaced.
+    """
+    return _source_offset(anchors, start, at_end=False), _source_offset(anchors, end, at_end=True)
+
+
+def _source_offset(anchors, offset: int, at_end: bool) -> int:
+    # Anchors alternate: index 2k-1 starts replacement k, index 2k ends it
+    i = bisect.bisect_right(anchors, (offset, float('inf'))) - 1
+    if at_end and i > 0 and anchors[i][0] == offset and i % 2 == 1:
+        # An end exactly at a replacement start belongs to the text before it
+        i -= 1
+    norm, src = anchors[i]
+    if i % 2 == 1 and i + 1 < len(anchors):
+        # Inside a replacement
+        return anchors[i + 1][1] if at_end else src
+    return src + offset - norm
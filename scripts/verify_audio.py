@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Check every published page MP3 for corruption and implausible length.
+
+Files are parsed in a process pool. Each one must be a clean run of MP3
+frames (no junk, no truncated last frame, one sample rate), and its real
+duration, summed from the frame headers, must be close to what the page's
+word count predicts. The prediction is a duration model fitted on the
+files themselves, refitted once without the outliers it finds.
+
+Flagged pages go to .audio_cache/verify_report.json. With --requeue their
+cache entries are dropped as well, so the next generate_all_voices.py run
+synthesizes exactly those pages again.
+
+Usage:
+    python scripts/verify_audio.py [voice ...] [--requeue] [--workers N]
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from audio_cache import CACHE_DIR, AudioCache
+from generate_all_voices import load_courses
+from mp3_frames import audio_frames, id3v2_size, iter_frames
+from tts_estimate import DurationEstimator
+from tts_text import normalize_for_tts
+from voices import VOICES
+
+BASE_DIR = Path(__file__).parent.parent
+AUDIO_DIR = BASE_DIR / 'public' / 'courses' / 'audio'
+REPORT_PATH = CACHE_DIR / 'verify_report.json'
+
+# Duration outside this share of the estimate (and off by more than MIN_DRIFT seconds) is suspect
+MIN_RATIO = 0.6
+MAX_RATIO = 1.6
+MIN_DRIFT = 5.0
+
+
+def check_file(path: str) -> dict:
+    """
+    Parse one MP3 and report its structure; runs in a worker process.
+
+    Only the first frame may be a Xing/Info header; anything between or
+    after frames other than a trailing ID3v1 tag counts as junk.
+    """
+    data = Path(path).read_bytes()
+    problems = []
+    frames = list(iter_frames(data))
+    covered = id3v2_size(data) + sum(f.length for f in frames)
+    junk = len(data) - covered
+    if data[-128:-125] == b'TAG':
+        junk -= 128
+    if not frames:
+        problems.append('no MP3 frames')
+    elif junk > 0:
+        end = frames[-1].offset + frames[-1].length
+        if junk == len(data) - end and data[end:end + 1] == b'\xff':
+            problems.append(f"truncated last frame ({junk} bytes)")
+        else:
+            problems.append(f"{junk} bytes of non-audio data")
+    if len({f.sample_rate for f in frames}) > 1:
+        problems.append('mixed sample rates')
+    seconds = sum(f.samples / f.sample_rate for f in audio_frames(data))
+    return {'path': path, 'bytes': len(data), 'seconds': round(seconds, 3), 'problems': problems}
+
+
+def expected_problem(seconds: float, expected: float):
+    if abs(seconds - expected) <= MIN_DRIFT:
+        return None
+    if seconds < expected * MIN_RATIO:
+        return f"too short: {seconds:.1f}s, expected ~{expected:.0f}s"
+    if seconds > expected * MAX_RATIO:
+        return f"too long: {seconds:.1f}s, expected ~{expected:.0f}s"
+    return None
+
+
+def verify(voices, workers: int = None) -> tuple[list[dict], DurationEstimator, int]:
+    """Check every page file of these voices; returns (flagged results, fitted model, files checked)."""
+    words = {
+        f"{page['course_id']}_{page['chapter_id']}": len(normalize_for_tts(page['content']).split())
+        for page in load_courses()
+    }
+    paths = []
+    for voice_id in voices:
+        for stem in words:
+            path = AUDIO_DIR / voice_id / f"{stem}.mp3"
+            if path.exists():
+                paths.append(str(path))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(check_file, paths, chunksize=8))
+    for result in results:
+        path = Path(result['path'])
+        result['file'] = path.relative_to(AUDIO_DIR).as_posix()
+        result['words'] = words[path.stem]
+
+    # Fit on the structurally sound files, then refit without the length outliers
+    sound = [r for r in results if not r['problems']]
+    estimator = DurationEstimator.fit([(r['words'], r['seconds']) for r in sound])
+    outliers = {r['file'] for r in sound if expected_problem(r['seconds'], estimator.estimate(r['words']))}
+    estimator = DurationEstimator.fit([(r['words'], r['seconds']) for r in sound if r['file'] not in outliers])
+
+    flagged = []
+    for result in results:
+        result['expected'] = round(estimator.estimate(result['words']), 1)
+        problem = expected_problem(result['seconds'], result['expected']) if result['seconds'] else None
+        if problem:
+            result['problems'].append(problem)
+        if result['problems']:
+            del result['path']
+            flagged.append(result)
+    return flagged, estimator, len(results)
+
+
+def requeue(flagged: list[dict], cache: AudioCache = None) -> int:
+    """Drop flagged pages (and their cached audio) from the cache so the next run regenerates them."""
+    cache = cache or AudioCache()
+    dropped = 0
+    for result in flagged:
+        key = cache.index.pop(result['file'], None)
+        if key is None:
+            continue
+        for path in (cache.object_path(key), cache.meta_path(key)):
+            if path.exists():
+                path.unlink()
+        dropped += 1
+    cache.save()
+    return dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify published course audio")
+    parser.add_argument('voices', nargs='*', help="voices to verify (default: all)")
+    parser.add_argument('--requeue', action='store_true',
+                        help="invalidate flagged pages so the next generation run redoes them")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    unknown = [v for v in args.voices if v not in VOICES]
+    if unknown:
+        parser.error(f"unknown voices: {unknown}; choose from {list(VOICES)}")
+    voices = args.voices or list(VOICES)
+
+    print(f"🔍 Verifying audio for {', '.join(voices)}")
+    flagged, estimator, checked = verify(voices, args.workers)
+    print(f"⏱️  Duration model: {estimator}")
+
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = REPORT_PATH.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'checked': checked, 'flagged': flagged}, f, indent=2)
+    os.replace(tmp, REPORT_PATH)
+
+    for result in flagged:
+        print(f"  ❌ {result['file']}: {'; '.join(result['problems'])}")
+    print(f"\n{'✅' if not flagged else '⚠️ '} {checked} files checked, {len(flagged)} flagged "
+          f"(report: {REPORT_PATH})")
+
+    if flagged and args.requeue:
+        dropped = requeue(flagged)
+        print(f"↩️  {dropped} pages queued for regeneration; run generate_all_voices.py to rebuild them")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == '__main__':
+    main()
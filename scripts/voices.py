@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Voice registry for the course reader.
+
+Every voice the reader offers is one Voice entry below. Generation jobs,
+manifests and preview clips are all derived from this list, so adding a
+voice only needs a new entry here.
+"""
+from collections import namedtuple
+
+Voice = namedtuple('Voice', 'id edge_name name gender description')
+
+REGISTRY = [
+    Voice('aria', 'en-US-AriaNeural', 'Aria', 'female', 'Warm & engaging'),
+    Voice('jenny', 'en-US-JennyNeural', 'Jenny', 'female', 'Clear & professional'),
+    Voice('michelle', 'en-US-MichelleNeural', 'Michelle', 'female', 'Friendly & expressive'),
+    Voice('christopher', 'en-US-ChristopherNeural', 'Christopher', 'male', 'Confident & clear'),
+    Voice('eric', 'en-US-EricNeural', 'Eric', 'male', 'Deep & authoritative'),
+    Voice('guy', 'en-US-GuyNeural', 'Guy', 'male', 'Calm & conversational'),
+]
+
+DEFAULT_VOICE = 'aria'
+
+# Voice id → Edge TTS voice name, in registry order
+VOICES = {voice.id: voice.edge_name for voice in REGISTRY}
+VOICE_INFO = {voice.id: voice for voice in REGISTRY}
+
+
+def sample_name(voice_id: str) -> str:
+    """Preview clip filename under public/courses/audio/samples/ (e.g. aria_female.mp3)."""
+    return f"{voice_id}_{VOICE_INFO[voice_id].gender}.mp3"